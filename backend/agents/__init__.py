@@ -4,6 +4,8 @@ from .workflow import (
     AgentState,
     coordinator_agent,
     research_agent,
+    run_in_background,
+    slim_context,
 )
 
 __all__ = [
@@ -11,5 +13,7 @@ __all__ = [
     "AgentState",
     "coordinator_agent",
     "research_agent",
+    "run_in_background",
+    "slim_context",
 ]
 
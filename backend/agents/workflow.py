@@ -1,21 +1,29 @@
 """
 Coordinator Agent Workflow for Compensation Recommendations.
 """
-from typing import TypedDict, Literal, Optional, Dict, Any, Set, List
+from typing import TypedDict, Literal, Optional, Dict, Any, Set, List, Callable
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage
+import asyncio
+import copy
+import hashlib
 import json
+import orjson
 import re
 import logging
+import time
 from datetime import datetime, timezone
+from contextlib import aclosing
+from functools import lru_cache
+from string import Formatter
 from config import settings
 from data.access import data_access
 from context.store import context_store
 from context.user_store import user_context_store
 from messages import message_store
-from models import UserType
+from models import UserType, RecommendationHistoryItem
 
 logger = logging.getLogger("compagent")
 if not logger.handlers:
@@ -28,7 +36,7 @@ logger.setLevel(logging.INFO)
 # CONSTANTS
 # ============================================================================
 
-REQUIRED_FIELDS = ["candidate_id", "job_title", "job_level", "location", "job_family", "interview_feedback"]
+REQUIRED_FIELDS = ("candidate_id", "job_title", "job_level", "location", "job_family", "interview_feedback")
 
 FIELD_DISPLAY_NAMES = {
     "candidate_id": "Candidate ID",
@@ -39,8 +47,8 @@ FIELD_DISPLAY_NAMES = {
     "interview_feedback": "Interview Panel Feedback (Must Hire/Strong Hire/Hire)"
 }
 
-VALID_LEVELS = {"P1", "P2", "P3", "P4", "P5"}
-VALID_FEEDBACK = {"Must Hire", "Strong Hire", "Hire"}
+VALID_LEVELS = frozenset({"P1", "P2", "P3", "P4", "P5"})
+VALID_FEEDBACK = frozenset({"Must Hire", "Strong Hire", "Hire"})
 
 # Compensation defaults by job level
 BONUS_BY_LEVEL = {"P5": 20, "P4": 15, "P3": 10, "P2": 8, "P1": 5}
@@ -48,6 +56,38 @@ EQUITY_BY_LEVEL = {"P5": 100000, "P4": 60000, "P3": 30000, "P2": 20000, "P1": 10
 DEFAULT_BONUS = 10
 DEFAULT_EQUITY = 30000
 
+METADATA_TTL_SECONDS = 60
+
+# Coordinator prompt history: at least HISTORY_TURNS exchanges, oldest first. The window
+# start only moves in steps of HISTORY_BUFFER, so for HISTORY_BUFFER turns in a row each
+# prompt extends the previous one and the provider's prompt prefix cache keeps hitting
+HISTORY_TURNS = 5
+HISTORY_BUFFER = 5
+
+GREETING_RESPONSE = "Hi! How can I help you with compensation today?"
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-flight
+_background_tasks: Set[asyncio.Task] = set()
+
+# Patterns applied on every coordinator turn - compiled once at import
+_CAND_RE = re.compile(r'CAND-([A-Z0-9_-]+)', re.IGNORECASE)
+_ACTION_RE = re.compile(r'ACTION\s*:\s*RESEARCH', re.IGNORECASE)
+# Markdown JSON code blocks, bare JSON objects and the ACTION marker, stripped in one pass
+_STRIP_RE = re.compile(r'```json[\s\S]*?```|\{[\s\S]*?\}|ACTION\s*:\s*RESEARCH', re.IGNORECASE)
+_NEG_FEEDBACK_RE = re.compile(r"\b(?:no|not|don'?t)[\s_-]+hire\b", re.IGNORECASE)
+_POS_FEEDBACK_RE = re.compile(r"\b(must|strong)[\s_-]+hire\b|(?:^|[\s_-])hire$", re.IGNORECASE)
+_GREETING_RE = re.compile(r'^\s*(hi|hello|hey|yo|good (morning|afternoon|evening))[!. ]*$', re.IGNORECASE)
+_PROCEED_RE = re.compile(
+    r'^\s*(?:(?:ok(?:ay)?|yes|sure|please)[,!. ]+)?(?:proceed|go ahead|yes|continue|recommend|recommendation|'
+    r'generate (?:the |a )?recommendation)(?:[,!. ]+please)?[!. ]*$',
+    re.IGNORECASE
+)
+# Keywords that mark a message as asking for a recommendation, matched in one scan
+_RECOMMENDATION_KW_RE = re.compile(r'recommendation|compensation|offer|salary', re.IGNORECASE)
+_FEEDBACK_BY_QUALIFIER = {"must": "Must Hire", "strong": "Strong Hire", "": "Hire"}
+
 # ============================================================================
 # STATE DEFINITION
 # ============================================================================
@@ -65,23 +105,29 @@ class AgentState(TypedDict):
     message_history: List[Dict[str, Any]]
     missing_fields: List[str]
     extracted_fields: Dict[str, Any]
+    judge_task: Optional[asyncio.Task]  # Judge LLM call started by Research, awaited by Judge
+    persist_task: Optional[asyncio.Task]  # Background save of the recommendation, awaited before re-reading context
+    progress_callback: Optional[Callable[[str], None]]  # Receives interim status text (SSE endpoint)
 
 # ============================================================================
 # LLM SETUP
 # ============================================================================
 
+@lru_cache(maxsize=1)
 def get_llm():
     try:
         return ChatOpenAI(model=settings.openai_model, temperature=0, openai_api_key=settings.openai_api_key)
-    except:
+    except Exception:
         return ChatGoogleGenerativeAI(model="gemini-pro", temperature=0, google_api_key=settings.gemini_api_key)
 
+@lru_cache(maxsize=1)
 def get_research_llm():
     try:
         return ChatOpenAI(model=settings.openai_model, temperature=0.2, openai_api_key=settings.openai_api_key)
-    except:
+    except Exception:
         return ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.2, google_api_key=settings.gemini_api_key)
 
+@lru_cache(maxsize=1)
 def get_judge_llm():
     return ChatGoogleGenerativeAI(model="gemini-pro", temperature=0, google_api_key=settings.gemini_api_key)
 
@@ -93,9 +139,74 @@ llm = get_llm()
 
 def extract_candidate_id(text: str) -> Optional[str]:
     """Extract CAND-XXX format ID from text."""
-    match = re.search(r'CAND-([A-Z0-9_-]+)', text, re.IGNORECASE)
+    match = _CAND_RE.search(text)
     return f"CAND-{match.group(1).upper()}" if match else None
 
+async def stream_llm_text(
+    model,
+    messages,
+    stop_pattern: Optional[re.Pattern] = None,
+    on_text: Optional[Callable[[str], None]] = None
+) -> str:
+    """Stream an LLM completion and return its text.
+    
+    If stop_pattern matches the tail of the streamed text, the stream is closed
+    early and the text received so far is returned. on_text, if given, is called
+    with each streamed piece as it arrives.
+    """
+    parts: List[str] = []
+    tail = ""
+    async with aclosing(model.astream(messages)) as stream:
+        async for chunk in stream:
+            piece = chunk.content
+            if not piece or not isinstance(piece, str):
+                continue
+            parts.append(piece)
+            if on_text is not None:
+                on_text(piece)
+            if stop_pattern is not None:
+                # Only the recent tail needs rescanning; markers may straddle chunk boundaries
+                window = tail + piece
+                if stop_pattern.search(window):
+                    break
+                tail = window[-64:]
+    return "".join(parts)
+
+async def _resolved(value):
+    """Awaitable placeholder for a lookup that can be skipped."""
+    return value
+
+def run_in_background(func, *args) -> asyncio.Task:
+    """Run a blocking call in a worker thread without awaiting it; failures are logged."""
+    task = asyncio.create_task(asyncio.to_thread(func, *args))
+    _background_tasks.add(task)
+    
+    def _done(t: asyncio.Task):
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception():
+            logger.warning(f"Background {getattr(func, '__name__', func)} failed: {t.exception()}")
+    
+    task.add_done_callback(_done)
+    return task
+
+def get_job_titles_prompt_block() -> str:
+    """Job titles formatted for the coordinator prompt, refreshed at most once a minute."""
+    return _job_titles_prompt_block(int(time.time() // METADATA_TTL_SECONDS))
+
+@lru_cache(maxsize=1)
+def _job_titles_prompt_block(epoch: int) -> str:
+    # Format job titles for prompt (first 50 to avoid token overflow)
+    job_titles_list = data_access.get_metadata().get("job_titles", [])[:50]
+    return "\n".join(f"- {title}" for title in job_titles_list)
+
+def slim_context(stored) -> Dict[str, Any]:
+    """Build the agent-facing context dict from a CandidateContext without a full model_dump()."""
+    context = {f: getattr(stored, f, None) for f in REQUIRED_FIELDS}
+    context["candidate_id"] = stored.candidate_id
+    context["proficiency"] = stored.proficiency
+    context["additional_context"] = getattr(stored, "additional_context", None) or {}
+    return context
+
 def get_missing_fields(context: Dict[str, Any]) -> List[str]:
     """Return list of missing required fields."""
     return [f for f in REQUIRED_FIELDS if not context.get(f)]
@@ -108,47 +219,43 @@ def normalize_feedback(value: str) -> Optional[str]:
     """Normalize interview feedback to standard values."""
     if not value:
         return None
-    lower = value.lower().replace("-", " ").replace("_", " ").strip()
     # Check negative cases first to avoid false positives
-    if "no hire" in lower or "do not hire" in lower or "don't hire" in lower or "not hire" in lower:
+    if _NEG_FEEDBACK_RE.search(value):
         return None  # Invalid feedback - don't proceed
-    if "must hire" in lower:
-        return "Must Hire"
-    if "strong hire" in lower:
-        return "Strong Hire"
-    # Require exact match or close to avoid false positives like "we should hire"
-    if lower == "hire" or lower.endswith(" hire"):
-        return "Hire"
-    return None
+    # Plain "Hire" only when it is the whole value or its final word
+    match = _POS_FEEDBACK_RE.search(value.strip())
+    if not match:
+        return None
+    return _FEEDBACK_BY_QUALIFIER[(match.group(1) or "").lower()]
+
+def dumps_prompt_json(obj: Any) -> str:
+    """Serialize obj to an indented JSON string for prompts (orjson; unknown types via str)."""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+
+def dumps_compact_json(obj: Any) -> str:
+    """Serialize obj to compact, key-sorted JSON for the Research/Judge prompts (no indentation tokens)."""
+    return orjson.dumps(
+        obj,
+        default=str,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
 
 def extract_json(text: str) -> Optional[dict]:
-    """Extract JSON object from text, handling nested structures."""
+    """Extract the first JSON object from text, handling nested structures."""
     if not text:
         logger.debug("extract_json: Empty text provided")
         return None
     
     logger.debug(f"extract_json: Attempting to extract JSON from text ({len(text)} chars)")
     
+    start = text.find('{')
+    if start < 0:
+        return None
+    
     try:
-        # Find the first '{' and match it with the correct '}'
-        start = text.find('{')
-        if start < 0:
-            return None
-        
-        # Count braces to find matching end
-        depth = 0
-        end = -1
-        for i, char in enumerate(text[start:], start):
-            if char == '{':
-                depth += 1
-            elif char == '}':
-                depth -= 1
-                if depth == 0:
-                    end = i
-                    break
-        
-        if end > start:
-            extracted = json.loads(text[start:end+1])
+        # raw_decode parses from the first '{' and stops at the matching '}' in one C-level pass
+        extracted, _ = _JSON_DECODER.raw_decode(text, start)
+        if isinstance(extracted, dict):
             logger.debug(f"extract_json: Successfully extracted JSON with keys: {list(extracted.keys())}")
             return extracted
     except json.JSONDecodeError as e:
@@ -159,6 +266,22 @@ def extract_json(text: str) -> Optional[dict]:
     logger.debug("extract_json: No valid JSON found")
     return None
 
+def compile_prompt(template: str):
+    """Pre-parse a str.format-style template into a render(**fields) function.
+    
+    The template is split into literal segments and field names once, so each
+    render is a single join instead of a fresh format-string parse.
+    """
+    segments = [(literal, field) for literal, field, _, _ in Formatter().parse(template)]
+    
+    def render(**fields: Any) -> str:
+        return "".join(
+            literal if field is None else f"{literal}{fields[field]}"
+            for literal, field in segments
+        )
+    
+    return render
+
 # ============================================================================
 # COORDINATOR PROMPT (DYNAMIC CONTEXT EXTRACTION)
 # ============================================================================
@@ -218,15 +341,15 @@ IMPORTANT: Every new piece of information should be captured in additional_conte
 
 LOCATION MAPPING: LA/Los Angeles→LAX, Seattle→SEA, St. Louis→STL, Dublin→DUB, Shanghai→SHA, Sydney→SYD, Singapore→SIN
 
+CONVERSATION HISTORY:
+{history_text}
+
 CURRENT CONTEXT:
 {context_json}
 
 EXISTING ADDITIONAL CONTEXT (accumulated from previous messages):
 {additional_context_json}
 
-CONVERSATION HISTORY:
-{history_text}
-
 USER MESSAGE: {message}
 
 INSTRUCTIONS:
@@ -268,6 +391,8 @@ Understood! The candidate has a counter offer of $350,000 and currently makes $2
 ACTION: RESEARCH
 """
 
+render_coordinator_prompt = compile_prompt(COORDINATOR_PROMPT)
+
 # ============================================================================
 # COORDINATOR AGENT
 # ============================================================================
@@ -282,6 +407,8 @@ async def coordinator_agent(state: AgentState) -> dict:
     5. Extract fields from response
     6. Validate completeness
     7. Route to research or respond
+    
+    Returns only the state keys that changed; LangGraph merges them into the graph state.
     """
     message = (state.get("message") or "").strip()
     user_email = state.get("user_email")
@@ -300,67 +427,88 @@ async def coordinator_agent(state: AgentState) -> dict:
         message_store.get_most_recent_candidate_id(user_email)
     )
     
-    # Let LLM handle all messages (greetings, off-topic, and compensation requests)
-    # No hardcoded responses - LLM will respond appropriately based on prompt
+    # Bare greetings with no candidate in scope don't need an LLM round-trip;
+    # everything else (off-topic and compensation requests) goes to the LLM
+    if not candidate_id and _GREETING_RE.match(message):
+        logger.info("Coordinator: Bare greeting with no candidate in scope - skipping LLM")
+        return {
+            "candidate_id": None,
+            "context": {},
+            "response": GREETING_RESPONSE,
+            "next_step": "respond"
+        }
     
     # -------------------------------------------------------------------------
     # STEP 2: Load context
     # -------------------------------------------------------------------------
+    # Context and history lookups are independent - run them concurrently
+    stored, message_history, message_count = await asyncio.gather(
+        asyncio.to_thread(context_store.get_context, candidate_id) if candidate_id else _resolved(None),
+        asyncio.to_thread(message_store.get_messages, user_email, limit=HISTORY_TURNS + HISTORY_BUFFER, candidate_id=candidate_id) if user_email else _resolved([]),
+        asyncio.to_thread(message_store.get_message_count, user_email, candidate_id) if user_email else _resolved(0),
+    )
+    
     context = {}
     if candidate_id:
-        stored = context_store.get_context(candidate_id)
         if stored and stored.state.value == "active":
-            context = stored.model_dump()
+            context = slim_context(stored)
         
-        # Update user's current candidate
+        # Update user's current candidate (off the critical path)
         if candidate_id != current_cid:
-            user_context_store.set_current_candidate(user_email, candidate_id)
-    
-    # Load message history for this user (optionally filtered by candidate)
-    message_history = message_store.get_messages(user_email, limit=10, candidate_id=candidate_id) if user_email else []
+            run_in_background(user_context_store.set_current_candidate, user_email, candidate_id)
     
     # -------------------------------------------------------------------------
     # STEP 3: Recruiter restrictions
     # -------------------------------------------------------------------------
     if user_type == UserType.RECRUITMENT_TEAM and candidate_id:
-        existing = context_store.get_context(candidate_id)
-        if not existing or not existing.recommendation_history:
+        # Reuse the context loaded in STEP 2 (regardless of state)
+        if not stored or not stored.recommendation_history:
             return {
-                **state,
                 "response": "I can only help you with candidates that have existing recommendations from the Compensation Team.",
                 "next_step": "respond"
             }
     
+    # Context already complete and the user just confirms - route straight to research
+    if context and not get_missing_fields(context) and context.get("job_level") in VALID_LEVELS and _PROCEED_RE.match(message):
+        logger.info(f"Coordinator: Context complete and user confirmed - routing to Research for {candidate_id} without LLM")
+        return {
+            "candidate_id": context.get("candidate_id"),
+            "context": context,
+            "research_data": context,
+            "response": "",
+            "next_step": "research"
+        }
+    
     # -------------------------------------------------------------------------
     # STEP 4: Build prompt and call LLM
     # -------------------------------------------------------------------------
-    metadata = data_access.get_metadata()
-    
-    # Format job titles for prompt (first 50 to avoid token overflow)
-    job_titles_list = metadata.get("job_titles", [])[:50]
-    job_titles_formatted = "\n".join([f"- {title}" for title in job_titles_list])
+    # A refresh reads metadata (and may reload the roster), so it runs off the event loop
+    job_titles_formatted = await asyncio.to_thread(get_job_titles_prompt_block)
     
-    context_json = json.dumps({
+    context_json = dumps_prompt_json({
         "candidate_id": context.get("candidate_id") or candidate_id,
         "job_title": context.get("job_title"),
         "job_level": context.get("job_level"),
         "location": context.get("location"),
         "job_family": context.get("job_family"),
         "interview_feedback": context.get("interview_feedback")
-    }, indent=2)
+    })
     
     # Get existing additional_context (accumulated from previous messages)
     existing_additional_context = context.get("additional_context", {})
-    additional_context_json = json.dumps(existing_additional_context, indent=2) if existing_additional_context else "{}"
+    additional_context_json = dumps_prompt_json(existing_additional_context) if existing_additional_context else "{}"
     
-    history_text = ""
-    for msg in message_history[-5:]:
+    # get_messages is newest first; keep everything after the anchored window start
+    window_start = max(0, message_count - HISTORY_TURNS) // HISTORY_BUFFER * HISTORY_BUFFER
+    history_lines = []
+    for msg in reversed(message_history[:max(0, message_count - window_start)]):
         if msg.get("message"):
-            history_text += f"User: {msg['message']}\n"
+            history_lines.append(f"User: {msg['message']}")
         if msg.get("response"):
-            history_text += f"Assistant: {msg['response']}\n"
+            history_lines.append(f"Assistant: {msg['response']}")
+    history_text = "\n".join(history_lines)
     
-    prompt = COORDINATOR_PROMPT.format(
+    prompt = render_coordinator_prompt(
         job_titles=job_titles_formatted,
         context_json=context_json,
         additional_context_json=additional_context_json,
@@ -369,30 +517,34 @@ async def coordinator_agent(state: AgentState) -> dict:
     )
     
     try:
-        response = await llm.ainvoke([SystemMessage(content=prompt)])
-        response_text = response.content or ""
+        # Stream so we can stop decoding as soon as the ACTION marker arrives
+        response_text = await stream_llm_text(llm, [SystemMessage(content=prompt)], stop_pattern=_ACTION_RE)
         logger.debug(f"Coordinator: LLM response length={len(response_text)}")
         # Log a preview (first 1000 chars) to avoid excessively long logs
         logger.debug(f"Coordinator: LLM response preview: {response_text[:1000]!r}")
     except Exception as e:
         logger.exception(f"Coordinator: LLM call failed: {e}")
-        return {**state, "response": f"Error: {e}", "next_step": "respond"}
+        return {"response": f"Error: {e}", "next_step": "respond"}
     
     # -------------------------------------------------------------------------
     # STEP 5: Parse LLM response
     # -------------------------------------------------------------------------
-    has_action_research = bool(re.search(r'ACTION\s*:\s*RESEARCH', response_text, re.IGNORECASE))
+    has_action_research = bool(_ACTION_RE.search(response_text))
     
     # Extract user-facing response (before JSON)
-    user_response = re.sub(r'```json[\s\S]*?```', '', response_text, flags=re.IGNORECASE)  # Remove markdown code blocks
-    user_response = re.sub(r'\{[\s\S]*?\}', '', user_response)  # Remove JSON objects
-    user_response = re.sub(r'ACTION\s*:\s*RESEARCH', '', user_response, flags=re.IGNORECASE)
-    user_response = user_response.strip()
+    user_response = _STRIP_RE.sub('', response_text).strip()
     
     # Extract JSON
     extracted = extract_json(response_text)
     logger.debug(f"Coordinator: extracted JSON keys: {list(extracted.keys()) if extracted else None}")
     
+    # Reject an invalid job level up front so it is never merged or saved;
+    # the field stays missing and the user is asked for it again
+    if extracted and extracted.get("job_level") and extracted["job_level"] not in VALID_LEVELS:
+        logger.warning(f"Coordinator: Dropping invalid extracted job level {extracted['job_level']!r} for {candidate_id}; "
+                       f"valid levels are {sorted(VALID_LEVELS)}")
+        extracted.pop("job_level")
+    
     # -------------------------------------------------------------------------
     # STEP 6: Merge extracted fields into context
     # -------------------------------------------------------------------------
@@ -439,10 +591,11 @@ async def coordinator_agent(state: AgentState) -> dict:
                  f"interview_feedback={context.get('interview_feedback')}")
     logger.info(f"Coordinator: Missing fields check result: {missing if missing else 'None - all fields present'}")
     
-    # Save context only if we have a candidate
+    # Save context only if we have a candidate; awaited (off the event loop) so the
+    # candidate lists the client reloads after the reply already include it
     if context.get("candidate_id"):
         try:
-            context_store.save_context(context["candidate_id"], context, user_email or "system")
+            await asyncio.to_thread(context_store.save_context, context["candidate_id"], dict(context), user_email or "system")
             logger.info(f"Coordinator: Saved context for {context.get('candidate_id')}")
         except Exception as e:
             logger.warning(f"Failed to save context for {context.get('candidate_id')}: {e}")
@@ -452,19 +605,19 @@ async def coordinator_agent(state: AgentState) -> dict:
     if not context.get("candidate_id"):
         logger.info("Coordinator: No candidate_id found in context — treating as greeting/off-topic")
         return {
-            **state,
             "candidate_id": None,
             "context": {},
-            "response": user_response or "Hi! How can I help you with compensation today?",
+            "response": user_response or GREETING_RESPONSE,
             "next_step": "respond"
         }
     
-    # Validate job level before proceeding (do this before missing fields check)
+    # Validate job level before proceeding (do this before missing fields check).
+    # Invalid extracted levels are already dropped in STEP 5, so this only guards
+    # values stored before that check existed
     job_level = context.get("job_level")
     if job_level and job_level not in VALID_LEVELS:
         logger.info(f"Coordinator: Invalid job level provided: {job_level}")
         return {
-            **state,
             "candidate_id": context.get("candidate_id"),
             "context": context,
             "response": f"Invalid job level '{job_level}'. Must be one of: {', '.join(sorted(VALID_LEVELS))}. Please provide a valid job level.",
@@ -479,13 +632,12 @@ async def coordinator_agent(state: AgentState) -> dict:
         
         # Check if user is explicitly asking for recommendation despite missing fields
         logger.debug(f"Coordinator: has_action_research={has_action_research}")
-        user_wants_recommendation = has_action_research or any(kw in message.lower() for kw in ["recommendation", "compensation", "offer", "salary"])
+        user_wants_recommendation = has_action_research or bool(_RECOMMENDATION_KW_RE.search(message))
         
         if user_wants_recommendation:
             # User wants recommendation but missing fields - be explicit
             logger.warning(f"Coordinator: User requested recommendation but missing fields: {missing}")
             return {
-                **state,
                 "candidate_id": context.get("candidate_id"),
                 "context": context,
                 "missing_fields": missing,
@@ -496,7 +648,6 @@ async def coordinator_agent(state: AgentState) -> dict:
             # User just provided some info - ask for missing fields
             logger.info(f"Coordinator: Will prompt user for missing fields and NOT route to research")
             return {
-                **state,
                 "candidate_id": context.get("candidate_id"),
                 "context": context,
                 "missing_fields": missing,
@@ -505,13 +656,12 @@ async def coordinator_agent(state: AgentState) -> dict:
             }
     
     # No missing fields - check if user wants recommendation
-    user_wants_recommendation = has_action_research or any(kw in message.lower() for kw in ["recommendation", "compensation", "offer", "salary"])
+    user_wants_recommendation = has_action_research or bool(_RECOMMENDATION_KW_RE.search(message))
     
     if user_wants_recommendation:
         # All fields present - ready for research
         logger.info(f"Coordinator: All fields present. Routing to Research for {context.get('candidate_id')} (has_action_research={has_action_research})")
         return {
-            **state,
             "candidate_id": context.get("candidate_id"),
             "context": context,
             "research_data": context,
@@ -521,7 +671,6 @@ async def coordinator_agent(state: AgentState) -> dict:
     
     # Just acknowledging info
     return {
-        **state,
         "candidate_id": context.get("candidate_id"),
         "context": context,
         "response": user_response or "Got it! Let me know when you're ready for a compensation recommendation.",
@@ -532,6 +681,12 @@ async def coordinator_agent(state: AgentState) -> dict:
 # DATA COLLECTOR AGENT (Sub-agent called by Research)
 # ============================================================================
 
+# Process-level cache of (market, parity) lookups shared across candidates,
+# keyed by normalized (job_title, location)
+COLLECTED_DATA_TTL_SECONDS = 300
+COLLECTED_DATA_MAX_ENTRIES = 512
+_COLLECTED_DATA_CACHE: Dict[tuple, tuple] = {}
+
 class DataCollectorAgent:
     """
     Data Collector Agent - Responsible for gathering compensation data from sources.
@@ -544,6 +699,10 @@ class DataCollectorAgent:
     The Research Agent will skip calling this if:
     - research_data already exists in state (from previous recommendation)
     - Data was recently collected for the same job_title/location combination
+    
+    Lookups are also cached per (job_title, location) for COLLECTED_DATA_TTL_SECONDS
+    (at most COLLECTED_DATA_MAX_ENTRIES, oldest evicted first),
+    so different candidates for the same role and location share one CSV read.
     """
     
     @staticmethod
@@ -587,9 +746,23 @@ class DataCollectorAgent:
         """
         logger.info(f"DataCollector: Collecting data for {job_title} in {location}")
         
-        # Collect from both sources
-        market_result = data_access.get_market_compensation(job_title, location)
-        parity_result = data_access.get_internal_parity(job_title, location)
+        cache_key = (job_title.strip().lower(), location.strip().upper())
+        cached = _COLLECTED_DATA_CACHE.get(cache_key)
+        if cached and time.monotonic() - cached[0] >= COLLECTED_DATA_TTL_SECONDS:
+            _COLLECTED_DATA_CACHE.pop(cache_key, None)
+            cached = None
+        if cached:
+            logger.info(f"DataCollector: Cache hit for {job_title} in {location}")
+            _, market_result, parity_result = cached
+        else:
+            # Collect from both sources concurrently (independent CSV lookups)
+            market_result, parity_result = await asyncio.gather(
+                asyncio.to_thread(data_access.get_market_compensation, job_title, location),
+                asyncio.to_thread(data_access.get_internal_parity, job_title, location),
+            )
+            if len(_COLLECTED_DATA_CACHE) >= COLLECTED_DATA_MAX_ENTRIES:
+                _COLLECTED_DATA_CACHE.pop(next(iter(_COLLECTED_DATA_CACHE)), None)  # Evict the oldest entry
+            _COLLECTED_DATA_CACHE[cache_key] = (time.monotonic(), market_result, parity_result)
         
         result = {
             "job_title": job_title,
@@ -671,22 +844,108 @@ OUTPUT (JSON only, no other text):
 }}
 """
 
+render_research_prompt = compile_prompt(RESEARCH_PROMPT)
+
+# Only these fields reach the Research prompt, so its size doesn't grow with
+# recommendation_history or whatever else has accumulated in the context/state
+_PROMPT_CTX_FIELDS = ("job_title", "job_level", "location", "interview_feedback", "additional_context", "job_family", "proficiency")
+_PROMPT_DATA_FIELDS = ("job_title", "location", "market_data", "internal_parity")
+
+# Process-level cache of raw Research LLM results. Keyed by everything the prompt
+# depends on (plus a hash of the prompt itself), so edits to RESEARCH_PROMPT or to
+# the candidate's inputs miss; the deterministic post-processing still runs on hits.
+# Set additional_context.refresh to bypass it.
+RESEARCH_CACHE_TTL_SECONDS = 3600
+RESEARCH_CACHE_MAX_ENTRIES = 256
+_RESEARCH_PROMPT_VERSION = hashlib.blake2b(RESEARCH_PROMPT.encode(), digest_size=8).hexdigest()
+_RESEARCH_CACHE: Dict[str, tuple] = {}
+
+def research_cache_key(context: Dict[str, Any], research_data: Dict[str, Any]) -> str:
+    """Hash the recommendation inputs into a stable cache key."""
+    key = orjson.dumps({
+        "prompt_version": _RESEARCH_PROMPT_VERSION,
+        "job_title": context.get("job_title"),
+        "job_level": context.get("job_level"),
+        "location": context.get("location"),
+        "interview_feedback": context.get("interview_feedback") or context.get("proficiency"),
+        "additional_context": context.get("additional_context") or {},
+        "market_data": research_data.get("market_data"),
+        "internal_parity": research_data.get("internal_parity"),
+    }, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(key, digest_size=16).hexdigest()
+
+def get_cached_research(key: str) -> Optional[dict]:
+    cached = _RESEARCH_CACHE.get(key)
+    if not cached:
+        return None
+    if time.monotonic() - cached[0] >= RESEARCH_CACHE_TTL_SECONDS:
+        _RESEARCH_CACHE.pop(key, None)
+        return None
+    # Post-processing mutates the result, so hand out a copy
+    return copy.deepcopy(cached[1])
+
+def cache_research(key: str, result: dict) -> None:
+    if len(_RESEARCH_CACHE) >= RESEARCH_CACHE_MAX_ENTRIES:
+        _RESEARCH_CACHE.pop(next(iter(_RESEARCH_CACHE)), None)  # Evict the oldest entry
+    _RESEARCH_CACHE[key] = (time.monotonic(), copy.deepcopy(result))
+
+_MONEY_TRANS = str.maketrans('', '', '$,')
+_MONEY_MULTIPLIERS = {'k': 1000.0, 'm': 1_000_000.0}
+
+RESEARCH_PROGRESS_EVERY_CHARS = 400
+
+def research_progress_reporter(callback: Optional[Callable[[str], None]]) -> Optional[Callable[[str], None]]:
+    """Wrap a progress callback so it is told roughly how much of the recommendation has streamed in."""
+    if callback is None:
+        return None
+    received = 0
+    reported = 0
+    
+    def on_text(piece: str) -> None:
+        nonlocal received, reported
+        received += len(piece)
+        if received - reported >= RESEARCH_PROGRESS_EVERY_CHARS:
+            reported = received
+            callback(f"✍️ Drafting recommendation... ({received:,} characters received)")
+    
+    return on_text
+
 def parse_money(s) -> Optional[float]:
     """Parse '$150k', '150000', '1.5m' → float. Returns None for invalid input."""
     if s is None or s == "":
         return None
+    t = str(s).translate(_MONEY_TRANS).strip().lower()
+    if not t:
+        return None
+    mult = _MONEY_MULTIPLIERS.get(t[-1])
+    if mult:
+        t = t[:-1]
     try:
-        t = str(s).lower().replace(',', '').replace('$', '').strip()
-        if not t:
-            return None
-        if t.endswith('k'):
-            return float(t[:-1]) * 1000
-        if t.endswith('m'):
-            return float(t[:-1]) * 1_000_000
-        result = float(t)
-        return result if result > 0 else None  # Treat 0 or negative as invalid
-    except (ValueError, TypeError):
+        result = float(t) * (mult or 1.0)
+    except ValueError:
         return None
+    return result if result > 0 else None  # Treat 0 or negative as invalid
+
+def _persist_recommendation(
+    candidate_id: str,
+    context_snapshot: Dict[str, Any],
+    result: Dict[str, Any],
+    user_email: Optional[str]
+) -> None:
+    """Append a recommendation to the candidate's stored history (runs in a worker thread)."""
+    try:
+        context_store.append_recommendation(
+            candidate_id,
+            RecommendationHistoryItem(
+                timestamp=datetime.now(timezone.utc).isoformat(),
+                context_snapshot=context_snapshot,
+                recommendation=result
+            ),
+            user_email or "system",
+            recommendation=result
+        )
+    except Exception as e:
+        logger.warning(f"Error saving recommendation to context: {e}")
 
 async def research_agent(state: AgentState) -> dict:
     """
@@ -742,21 +1001,38 @@ async def research_agent(state: AgentState) -> dict:
             "next_step": "respond"
         }
     
-    # Call LLM for recommendation
-    prompt = RESEARCH_PROMPT.format(
-        context_json=json.dumps(context, indent=2, default=str),
-        data_json=json.dumps(research_data, indent=2, default=str)
-    )
-    
-    try:
-        response = await get_research_llm().ainvoke([SystemMessage(content=prompt)])
-        result = extract_json(response.content)
-    except Exception as e:
-        logger.exception("Research LLM error")
-        return {**state, "response": f"Research error: {e}", "next_step": "respond"}
+    # Same inputs as a recent run → reuse that LLM result instead of another round-trip
+    cache_key = research_cache_key(context, research_data)
+    refresh = bool((context.get("additional_context") or {}).get("refresh"))
+    result = None if refresh else get_cached_research(cache_key)
     
-    if not result:
-        return {**state, "response": "Could not parse recommendation.", "next_step": "respond"}
+    if result:
+        logger.info(f"Research: Reusing cached LLM result for {job_title} in {location}")
+    else:
+        # Call LLM for recommendation
+        prompt = render_research_prompt(
+            context_json=dumps_compact_json({k: context.get(k) for k in _PROMPT_CTX_FIELDS}),
+            data_json=dumps_compact_json({k: research_data.get(k) for k in _PROMPT_DATA_FIELDS})
+        )
+        
+        try:
+            if settings.stream_research_llm:
+                response_text = await stream_llm_text(
+                    get_research_llm(),
+                    [SystemMessage(content=prompt)],
+                    on_text=research_progress_reporter(state.get("progress_callback"))
+                )
+            else:
+                response_text = (await get_research_llm().ainvoke([SystemMessage(content=prompt)])).content
+            result = extract_json(response_text)
+        except Exception as e:
+            logger.exception("Research LLM error")
+            return {**state, "response": f"Research error: {e}", "next_step": "respond"}
+        
+        if not result:
+            return {**state, "response": "Could not parse recommendation.", "next_step": "respond"}
+        
+        cache_research(cache_key, result)
     
     # Normalize recommendation values
     rec = result.get("recommendation", {})
@@ -770,58 +1046,59 @@ async def research_agent(state: AgentState) -> dict:
     logger.info(f"Research: Counter offer from context = {counter_offer}")
     
     # Ensure numeric values - use constants for defaults
-    rec["base_salary"] = parse_money(rec.get("base_salary"))
-    rec["bonus_percentage"] = float(rec.get("bonus_percentage") or BONUS_BY_LEVEL.get(level, DEFAULT_BONUS))
-    parsed_equity = parse_money(rec.get("equity_amount"))
-    rec["equity_amount"] = parsed_equity if parsed_equity is not None else EQUITY_BY_LEVEL.get(level, DEFAULT_EQUITY)
-    logger.info(f"Research: Parsed rec base_salary={rec.get('base_salary')}, counter_offer={counter_offer}")
+    # (kept in locals through the adjustments below and written back to rec once)
+    base_salary = parse_money(rec.get("base_salary"))
+    bonus_pct = float(rec.get("bonus_percentage") or BONUS_BY_LEVEL.get(level, DEFAULT_BONUS))
+    equity = parse_money(rec.get("equity_amount"))
+    if equity is None:
+        equity = EQUITY_BY_LEVEL.get(level, DEFAULT_EQUITY)
+    bonus_factor = 1 + bonus_pct / 100
+    logger.info(f"Research: Parsed rec base_salary={base_salary}, counter_offer={counter_offer}")
     
     # Calculate percentile from market data
-    market_min = float(market_data.get("Min") or market_data.get("min") or 0) if market_data else 0
-    market_max = float(market_data.get("Max") or market_data.get("max") or 0) if market_data else 0
+    # DataCollector emits model_dump() output, so keys are always lowercase
+    market_min = float(market_data.get("min") or 0) if market_data else 0
+    market_max = float(market_data.get("max") or 0) if market_data else 0
+    market_span = market_max - market_min
     
     # Ensure we have a base salary - if LLM didn't provide one, calculate based on interview feedback
-    if not rec.get("base_salary") and market_max > 0:
+    if not base_salary and market_max > 0:
         interview_fb = context.get("interview_feedback", "").lower()
         if "must" in interview_fb:
-            rec["base_salary"] = round(market_min + (market_max - market_min) * 0.85, 0)  # 85th percentile
+            base_salary = round(market_min + market_span * 0.85, 0)  # 85th percentile
         elif "strong" in interview_fb:
-            rec["base_salary"] = round(market_min + (market_max - market_min) * 0.75, 0)  # 75th percentile
+            base_salary = round(market_min + market_span * 0.75, 0)  # 75th percentile
         else:
-            rec["base_salary"] = round(market_min + (market_max - market_min) * 0.50, 0)  # 50th percentile
-        logger.info(f"Research: Calculated base salary ${rec['base_salary']:,.0f} based on interview feedback")
+            base_salary = round(market_min + market_span * 0.50, 0)  # 50th percentile
+        logger.info(f"Research: Calculated base salary ${base_salary:,.0f} based on interview feedback")
     
     # Handle counter offer from additional_context - try to meet or exceed it within market constraints
-    if counter_offer and rec.get("base_salary"):
+    if counter_offer and base_salary:
         counter_offer_value = parse_money(counter_offer)
-        if counter_offer_value > 0:
+        if counter_offer_value:
             logger.info(f"Research: Adjusting for counter offer of ${counter_offer_value:,.0f}")
             rec["counter_offer"] = counter_offer_value
             
             # Calculate what base salary would be needed
             # Total = base + base*bonus% + equity
             # If counter_offer = total, then base = (counter_offer - equity) / (1 + bonus%)
-            target_base = (counter_offer_value - rec["equity_amount"]) / (1 + rec["bonus_percentage"] / 100)
+            target_base = (counter_offer_value - equity) / bonus_factor
             
             if target_base <= market_max:
                 # We can meet the counter offer within market range
-                rec["base_salary"] = round(max(market_min, target_base), 0)
+                base_salary = round(max(market_min, target_base), 0)
                 result["status"] = "approved"
-                logger.info(f"Research: Adjusted base to ${rec['base_salary']:,.0f} to meet counter offer")
+                logger.info(f"Research: Adjusted base to ${base_salary:,.0f} to meet counter offer")
             else:
                 # Counter offer exceeds what we can do - offer max and flag for review
-                rec["base_salary"] = market_max
+                base_salary = market_max
                 
                 # Calculate gap before adding equity boost
-                original_equity = rec["equity_amount"]
-                max_total_before_boost = market_max * (1 + rec["bonus_percentage"] / 100) + original_equity
-                gap = counter_offer_value - max_total_before_boost
+                gap = counter_offer_value - (market_max * bonus_factor + equity)
                 
                 # Add up to $50k extra equity to bridge the gap
-                equity_boost = 0
-                if gap > 0:
-                    equity_boost = min(gap, 50000)
-                    rec["equity_amount"] = original_equity + equity_boost
+                equity_boost = min(gap, 50000) if gap > 0 else 0
+                equity += equity_boost
                 
                 remaining_gap = gap - equity_boost
                 result["status"] = "needs_review"
@@ -833,22 +1110,24 @@ async def research_agent(state: AgentState) -> dict:
                 
                 logger.warning(f"Research: Counter offer ${counter_offer_value:,.0f} exceeds market max ${market_max:,.0f}. Gap: ${gap:,.0f}, Equity boost: ${equity_boost:,.0f}")
     
+    rec.update({"base_salary": base_salary, "bonus_percentage": bonus_pct, "equity_amount": equity})
+    
     # Store additional_context in recommendation for reference
     if additional_context:
         rec["additional_context_applied"] = additional_context
     
-    if rec.get("base_salary") and market_max > market_min:
-        percentile = ((rec["base_salary"] - market_min) / (market_max - market_min)) * 100
+    if base_salary and market_span > 0:
+        percentile = ((base_salary - market_min) / market_span) * 100
         rec["base_salary_percentile"] = round(max(0, min(100, percentile)), 1)  # Clamp to 0-100
     else:
         # Default to 50th percentile if no data or invalid
         rec["base_salary_percentile"] = rec.get("base_salary_percentile") or 50
     
     # Calculate total comp
-    if rec.get("base_salary"):
-        bonus_amount = rec["base_salary"] * rec["bonus_percentage"] / 100
+    if base_salary:
+        bonus_amount = base_salary * bonus_pct / 100
         rec["bonus_amount"] = round(bonus_amount, 2)
-        rec["total_compensation"] = round(rec["base_salary"] + bonus_amount + rec["equity_amount"], 2)
+        rec["total_compensation"] = round(base_salary + bonus_amount + equity, 2)
     
     # Store market data citations for frontend (using already extracted values)
     rec["market_range"] = {
@@ -862,9 +1141,9 @@ async def research_agent(state: AgentState) -> dict:
     if parity.get("available") and parity.get("data"):
         parity_data = parity["data"]
         rec["internal_parity"] = {
-            "min": float(parity_data.get("Min") or parity_data.get("min") or 0),
-            "max": float(parity_data.get("Max") or parity_data.get("max") or 0),
-            "count": int(parity_data.get("Count") or parity_data.get("count") or 0),
+            "min": float(parity_data.get("min") or 0),
+            "max": float(parity_data.get("max") or 0),
+            "count": int(parity_data.get("count") or 0),
             "source": "EmployeeRoster.csv"
         }
     
@@ -908,35 +1187,35 @@ async def research_agent(state: AgentState) -> dict:
     )
     result["response_text"] = response_text
     
-    # Save recommendation
+    # Start the Judge LLM call now so it overlaps with persisting the recommendation
+    # and the hand-off to the judge node, which only has to await it
+    judge_task = None
+    if settings.enable_judge_agent:
+        judge_task = asyncio.create_task(validate_recommendation(result, research_data))
+    
+    # Save recommendation in the background so the response isn't held up by the write
+    persist_task = None
     if candidate_id:
-        try:
-            ctx = context_store.get_context(candidate_id)
-            if ctx:
-                ctx_dict = ctx.model_dump() if hasattr(ctx, 'model_dump') else dict(ctx)
-                # Prepare context snapshot for history
-                context_snapshot = {
-                    "job_title": context.get("job_title"),
-                    "job_level": context.get("job_level"),
-                    "location": context.get("location"),
-                    "interview_feedback": context.get("interview_feedback") or context.get("proficiency"),
-                    "job_family": context.get("job_family"),
-                }
-                ctx_dict.setdefault("recommendation_history", []).append({
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "context_snapshot": context_snapshot,
-                    "recommendation": result
-                })
-                ctx_dict["recommendation"] = result
-                context_store.save_context(candidate_id, ctx_dict, user_email or "system")
-        except Exception as e:
-            logger.warning(f"Error saving recommendation to context: {e}")
+        # Prepare context snapshot for history
+        context_snapshot = {
+            "job_title": context.get("job_title"),
+            "job_level": context.get("job_level"),
+            "location": context.get("location"),
+            "interview_feedback": context.get("interview_feedback") or context.get("proficiency"),
+            "job_family": context.get("job_family"),
+        }
+        # The judge may annotate result while the save runs, so persist a snapshot
+        persist_task = run_in_background(
+            _persist_recommendation, candidate_id, context_snapshot, copy.deepcopy(result), user_email
+        )
     
     return {
         **state,
         "research_data": research_data,
         "recommendation": result,
         "response": result.get("response_text", "Recommendation complete."),
+        "judge_task": judge_task,
+        "persist_task": persist_task,
         "next_step": "judge" if settings.enable_judge_agent else "respond"
     }
 
@@ -959,36 +1238,51 @@ OUTPUT (JSON only):
 {{"approved": true|false, "issues": [], "feedback": "..."}}
 """
 
+render_judge_prompt = compile_prompt(JUDGE_PROMPT)
+
+async def validate_recommendation(recommendation: Dict[str, Any], research_data: Dict[str, Any]) -> Optional[dict]:
+    """Run the Judge LLM over a recommendation. Returns the parsed verdict, or None on error."""
+    prompt = render_judge_prompt(
+        data_json=dumps_compact_json({"market": research_data.get("market_data"), "parity": research_data.get("internal_parity")}),
+        recommendation_json=dumps_compact_json(recommendation)
+    )
+    
+    try:
+        response = await get_judge_llm().ainvoke([SystemMessage(content=prompt)])
+        return extract_json(response.content)
+    except Exception as e:
+        logger.warning(f"Judge agent error (continuing without validation): {e}")
+        return None
+
 async def judge_agent(state: AgentState) -> dict:
     """Validate recommendation against data."""
+    judge_task = state.get("judge_task")
+    
     if not settings.enable_judge_agent:
-        return {**state, "next_step": "respond"}
+        return {**state, "judge_task": None, "next_step": "respond"}
     
     recommendation = state.get("recommendation", {})
     research_data = state.get("research_data", {})
     
     if not recommendation:
-        return {**state, "next_step": "respond"}
+        return {**state, "judge_task": None, "next_step": "respond"}
     
-    prompt = JUDGE_PROMPT.format(
-        data_json=json.dumps({"market": research_data.get("market_data"), "parity": research_data.get("internal_parity")}, indent=2),
-        recommendation_json=json.dumps(recommendation, indent=2)
-    )
+    # Research normally starts the validation already; fall back to running it here
+    if judge_task:
+        result = await judge_task
+    else:
+        result = await validate_recommendation(recommendation, research_data)
     
-    try:
-        response = await get_judge_llm().ainvoke([SystemMessage(content=prompt)])
-        result = extract_json(response.content)
-        if result:
-            recommendation["judge_validation"] = result
-            if not result.get("approved"):
-                recommendation["status"] = "needs_review"
-    except Exception as e:
-        logger.warning(f"Judge agent error (continuing without validation): {e}")
+    if result:
+        recommendation["judge_validation"] = result
+        if not result.get("approved"):
+            recommendation["status"] = "needs_review"
     
     return {
         **state,
         "recommendation": recommendation,
         "response": recommendation.get("response_text", "Recommendation complete."),
+        "judge_task": None,
         "next_step": "respond"
     }
 
@@ -1068,7 +1362,9 @@ async def run_workflow(message: str, user_email: str, user_type: str = "comp_tea
         "user_type": user_type,
         "message_history": [],
         "missing_fields": [],
-        "extracted_fields": {}
+        "extracted_fields": {},
+        "judge_task": None,
+        "persist_task": None
     }
     
     return await agent_workflow.ainvoke(initial_state)
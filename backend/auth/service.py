@@ -1,85 +1,88 @@
 """Authentication and authorization."""
-from datetime import datetime, timedelta
-from typing import Optional
+import base64
+import hashlib
+import hmac
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+import orjson
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from models import UserType
 
-# Hardcoded users from PRD
-USERS = {
-    "riot-comp-user1@example.com": {
-        "password": "Welcome@121",
-        "user_type": UserType.COMP_TEAM,
-        "first_name": "User1"
-    },
-    "riot-comp-user2@example.com": {
-        "password": "Welcome@122",
-        "user_type": UserType.COMP_TEAM,
-        "first_name": "User2"
-    },
-    "riot-comp-user3@example.com": {
-        "password": "Welcome@123",
-        "user_type": UserType.COMP_TEAM,
-        "first_name": "User3"
-    },
-    "riot-rec-user1@example.com": {
-        "password": "Welcome@121",
-        "user_type": UserType.RECRUITMENT_TEAM,
-        "first_name": "User1"
-    },
-    "riot-rec-user2@example.com": {
-        "password": "Welcome@122",
-        "user_type": UserType.RECRUITMENT_TEAM,
-        "first_name": "User2"
-    },
-    "riot-rec-user3@example.com": {
-        "password": "Welcome@123",
-        "user_type": UserType.RECRUITMENT_TEAM,
-        "first_name": "User3"
-    },
+
+@dataclass(slots=True, frozen=True)
+class UserRecord:
+    """A hardcoded user account."""
+    password: str
+    user_type: UserType
+    first_name: str
+
+
+# Hardcoded users from PRD (read-only)
+USERS = MappingProxyType({
+    "riot-comp-user1@example.com": UserRecord(password="Welcome@121", user_type=UserType.COMP_TEAM, first_name="User1"),
+    "riot-comp-user2@example.com": UserRecord(password="Welcome@122", user_type=UserType.COMP_TEAM, first_name="User2"),
+    "riot-comp-user3@example.com": UserRecord(password="Welcome@123", user_type=UserType.COMP_TEAM, first_name="User3"),
+    "riot-rec-user1@example.com": UserRecord(password="Welcome@121", user_type=UserType.RECRUITMENT_TEAM, first_name="User1"),
+    "riot-rec-user2@example.com": UserRecord(password="Welcome@122", user_type=UserType.RECRUITMENT_TEAM, first_name="User2"),
+    "riot-rec-user3@example.com": UserRecord(password="Welcome@123", user_type=UserType.RECRUITMENT_TEAM, first_name="User3"),
+})
+
+# Public view of each user, built once; read-only proxies, since the same view is
+# handed to every request (and kept in _TOKEN_CACHE)
+_USER_VIEWS = {
+    email: MappingProxyType({"email": email, "user_type": user.user_type, "first_name": user.first_name})
+    for email, user in USERS.items()
 }
 
 SECRET_KEY = "comp-agent-secret-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def _b64url(data: bytes) -> bytes:
+    """Unpadded base64url, as used by JWS."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+# Verified token -> (valid-until epoch seconds, user view)
+TOKEN_CACHE_TTL_SECONDS = 30
+TOKEN_CACHE_MAX_ENTRIES = 10_000
+_TOKEN_CACHE: Dict[str, Tuple[float, Mapping[str, object]]] = {}
 
+# Tokens are signed inline, which only covers the HMAC algorithms; fail at import
+# rather than issue tokens verify_token would reject
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+if ALGORITHM not in _HMAC_DIGESTS:
+    raise RuntimeError(f"create_access_token signs tokens inline and needs an HS* ALGORITHM, not {ALGORITHM!r}")
 
-def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    return pwd_context.hash(password)
+# Signing parts that never change, computed once (the header follows ALGORITHM)
+_HEADER_B64 = _b64url(orjson.dumps({"alg": ALGORITHM, "typ": "JWT"}))
+_KEY_BYTES = SECRET_KEY.encode()
+_DIGEST = _HMAC_DIGESTS[ALGORITHM]
 
 
-def authenticate_user(email: str, password: str) -> Optional[dict]:
+def authenticate_user(email: str, password: str) -> Optional[Mapping[str, object]]:
     """Authenticate a user with email and password."""
     user = USERS.get(email)
     if not user:
         return None
-    if user["password"] != password:  # Simple comparison for MVP
+    if not hmac.compare_digest(user.password.encode(), password.encode()):  # Plaintext for MVP, constant-time compare
         return None
-    return {
-        "email": email,
-        "user_type": user["user_type"],
-        "first_name": user["first_name"]
-    }
+    return _USER_VIEWS[email]
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token."""
+    """Create a JWT access token (signed inline with ALGORITHM; verify_token decodes it with jose)."""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    if expires_delta is None:
+        expires_delta = timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+    to_encode["exp"] = int(time.time() + expires_delta.total_seconds())
+    signing_input = _HEADER_B64 + b"." + _b64url(orjson.dumps(to_encode, default=str))
+    signature = hmac.new(_KEY_BYTES, signing_input, _DIGEST).digest()
+    return (signing_input + b"." + _b64url(signature)).decode()
 
 
 def verify_token(token: str) -> Optional[dict]:
@@ -91,20 +94,26 @@ def verify_token(token: str) -> Optional[dict]:
         return None
 
 
-def get_user_from_token(token: str) -> Optional[dict]:
-    """Get user information from token."""
+def get_user_from_token(token: str) -> Optional[Mapping[str, object]]:
+    """Get user information from token.
+    
+    Verified tokens are remembered for TOKEN_CACHE_TTL_SECONDS (never past their
+    exp), so a client's repeated requests don't re-verify the signature each time.
+    """
+    now = time.time()
+    cached = _TOKEN_CACHE.get(token)
+    if cached and now < cached[0]:
+        return cached[1]
+    
     payload = verify_token(token)
     if not payload:
         return None
-    email = payload.get("sub")
-    if email and email in USERS:
-        user = USERS[email]
-        return {
-            "email": email,
-            "user_type": user["user_type"],
-            "first_name": user["first_name"]
-        }
-    return None
+    user = _USER_VIEWS.get(payload.get("sub"))
+    if user:
+        if len(_TOKEN_CACHE) >= TOKEN_CACHE_MAX_ENTRIES:
+            _TOKEN_CACHE.pop(next(iter(_TOKEN_CACHE)), None)  # Evict the oldest entry
+        _TOKEN_CACHE[token] = (min(now + TOKEN_CACHE_TTL_SECONDS, payload.get("exp", now)), user)
+    return user
 
 
 
@@ -23,6 +23,7 @@ class Settings(BaseSettings):
     
     # Agent Configuration
     enable_judge_agent: bool = True  # Enable/disable Judge agent (default: True)
+    stream_research_llm: bool = False  # Stream the Research LLM and report drafting progress to the client
     
     # Testing Configuration
     use_real_llm_in_tests: bool = False  # Set to True to use real LLM in tests (requires API keys)
@@ -1,11 +1,126 @@
 """Candidate context storage."""
-import json
-import os
+import atexit
+import sqlite3
+import threading
+import orjson
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Set
 from datetime import datetime, timezone
-from models import CandidateContext, CandidateState
+from pydantic import TypeAdapter
+from models import CandidateContext, CandidateState, RecommendationHistoryItem
 from config import DATA_DIR
+from utils.file_io import dumps_json, read_json, warm_page_cache
+
+
+def _replace_value(old: Any, new: Any) -> Any:
+    return new
+
+
+def _deep_merge(old: Any, new: Any) -> Any:
+    return {**old, **new} if isinstance(old, dict) and isinstance(new, dict) else new
+
+
+def _list_append(old: Any, new: Any) -> Any:
+    return old + new if isinstance(old, list) and isinstance(new, list) else new
+
+
+# How save_context combines an incoming field with the stored value; anything not
+# listed here (including the core job fields) is simply replaced
+FIELD_POLICY: Dict[str, Callable[[Any, Any], Any]] = {
+    "additional_data": _deep_merge,
+    "recommendation_history": _list_append,
+}
+
+# Fields a replace_existing save never takes from the caller
+_REPLACE_PROTECTED_FIELDS = frozenset({"candidate_id", "created_at", "created_by", "updated_at", "updated_by", "state"})
+
+# Fields never recorded as field changes in the audit log
+_UNAUDITED_FIELDS = frozenset({"candidate_id", "created_at", "updated_at"})
+
+# Metadata save_context sets itself (outside the merge loop) that is still audited
+_AUDITED_METADATA_FIELDS = ("updated_by", "created_by", "state")
+
+
+def _diff_fields(old_data: Dict[str, Any], new_data: Dict[str, Any], keys) -> Dict[str, tuple]:
+    """(old, new) pairs for the audited keys whose value differs between the two dicts."""
+    changes = {}
+    for key in keys:
+        if key in _UNAUDITED_FIELDS:
+            continue
+        old_value = old_data.get(key)
+        new_value = new_data.get(key)
+        if old_value != new_value:
+            changes[key] = (old_value, new_value)
+    return changes
+
+
+_DATETIME_FIELDS = ("created_at", "updated_at", "closed_at")
+
+# Full validation for rows _construct_context can't take as-is; the adapter builds
+# its validator once here rather than on every call
+_validate_context = TypeAdapter(CandidateContext).validate_python
+
+
+def _construct_context(candidate_id: str, ctx_data: Dict[str, Any]) -> CandidateContext:
+    """Build a CandidateContext from a stored row, skipping validation where possible.
+    
+    Rows in the store were written by us, so instead of a full pydantic pass only
+    the fields callers rely on as typed values are converted (state, timestamps,
+    history items). Containers are copied so callers can't mutate the cache. Rows
+    this shortcut can't convert (e.g. older timestamp formats) are validated.
+    """
+    try:
+        values = {key: ctx_data[key] for key in CandidateContext.model_fields if key in ctx_data}
+        values["candidate_id"] = candidate_id
+        if "state" in values:
+            values["state"] = CandidateState(values["state"])
+        for key in _DATETIME_FIELDS:
+            if isinstance(values.get(key), str):
+                values[key] = datetime.fromisoformat(values[key])
+        if "additional_data" in values:
+            values["additional_data"] = dict(values["additional_data"])
+        if "recommendation_history" in values:
+            values["recommendation_history"] = [
+                item if isinstance(item, RecommendationHistoryItem) else RecommendationHistoryItem.model_construct(**item)
+                for item in values["recommendation_history"]
+            ]
+        return CandidateContext.model_construct(**values)
+    except (ValueError, TypeError, AttributeError):
+        return _validate_context({**ctx_data, "candidate_id": candidate_id})
+
+
+@dataclass(slots=True)
+class AuditEvent:
+    """One audit log entry, kept slotted since the in-memory log holds every event."""
+    timestamp: str
+    user: Optional[str]
+    field: str
+    old_value: Any
+    new_value: Any
+    # Only set on context_replacement events
+    original_creator: Optional[str] = None
+    replacing_user: Optional[str] = None
+    replacement_type: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuditEvent":
+        return cls(**{key: data.get(key) for key in cls.__slots__})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The event in the API's dict shape (replacement keys only when set)."""
+        data = {
+            "timestamp": self.timestamp,
+            "user": self.user,
+            "field": self.field,
+            "old_value": self.old_value,
+            "new_value": self.new_value
+        }
+        if self.replacement_type is not None:
+            data["original_creator"] = self.original_creator
+            data["replacing_user"] = self.replacing_user
+            data["replacement_type"] = self.replacement_type
+        return data
 
 
 class ContextStore:
@@ -13,66 +128,191 @@ class ContextStore:
     
     def __init__(self, data_dir: Path = None):
         self.data_dir = data_dir or DATA_DIR
+        # SQLite (WAL) database: one row per candidate and one per audit event, so a
+        # save rewrites only the rows it touched
+        self.db_file = self.data_dir / "contexts.db"
+        # Earlier file-based stores, imported once into an empty database
         self.contexts_file = self.data_dir / "contexts.json"
-        self.audit_log_file = self.data_dir / "context_audit_log.json"
-        self._ensure_files_exist()
+        self.audit_log_file = self.data_dir / "context_audit_log.jsonl"
+        self.legacy_audit_log_file = self.data_dir / "context_audit_log.json"
+        # Serializes read-modify-write cycles and all use of the connection;
+        # saves may run from worker threads
+        self._lock = threading.RLock()
+        # In-memory copies of contexts and the audit log, loaded on first access;
+        # writers mutate these and flush() writes back the touched rows
+        self._contexts: Optional[Dict[str, Any]] = None
+        self._audit_log: Optional[Dict[str, List[AuditEvent]]] = None
+        self._dirty_ids: Set[str] = set()
+        self._deleted_ids: Set[str] = set()
+        self._pending_audit: List[tuple] = []
+        # Contexts load on first access; prefetch the database pages in the meantime
+        warm_page_cache(self.db_file)
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._ensure_schema()
+        atexit.register(self.flush)
     
-    def _ensure_files_exist(self):
-        """Ensure context files exist."""
+    def _ensure_schema(self):
+        """Create the tables if needed and import any legacy JSON data."""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS contexts ("
+                "candidate_id TEXT PRIMARY KEY, data TEXT NOT NULL, state TEXT, updated_at TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_contexts_state ON contexts(state)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS audit ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, candidate_id TEXT NOT NULL, "
+                "ts TEXT, user TEXT, field TEXT, event TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_candidate ON audit(candidate_id)")
+            
+            if not self._conn.execute("SELECT 1 FROM contexts LIMIT 1").fetchone():
+                self._import_legacy_contexts()
+            if not self._conn.execute("SELECT 1 FROM audit LIMIT 1").fetchone():
+                self._import_legacy_audit_log()
+    
+    def _import_legacy_contexts(self):
+        """Copy contexts from contexts.json into the database."""
         if not self.contexts_file.exists():
-            with open(self.contexts_file, 'w', encoding='utf-8') as f:
-                json.dump({}, f)
-        if not self.audit_log_file.exists():
-            with open(self.audit_log_file, 'w', encoding='utf-8') as f:
-                json.dump({}, f)
+            return
+        try:
+            contexts = read_json(self.contexts_file)
+        except Exception as e:
+            print(f"Error reading legacy contexts: {e}")
+            return
+        if isinstance(contexts, dict):
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO contexts (candidate_id, data, state, updated_at) VALUES (?, ?, ?, ?)",
+                [self._context_row(candidate_id, ctx) for candidate_id, ctx in contexts.items()]
+            )
+    
+    def _import_legacy_audit_log(self):
+        """Copy audit events from the JSONL (or older JSON) audit log into the database."""
+        events = []
+        try:
+            if self.audit_log_file.exists():
+                with open(self.audit_log_file, 'rb') as f:
+                    for line in f:
+                        if line.strip():
+                            event = orjson.loads(line)
+                            events.append((event.pop("candidate_id", None), AuditEvent.from_dict(event)))
+            elif self.legacy_audit_log_file.exists():
+                legacy = read_json(self.legacy_audit_log_file)
+                if isinstance(legacy, dict):
+                    events = [
+                        (candidate_id, AuditEvent.from_dict(event))
+                        for candidate_id, items in legacy.items() for event in items
+                    ]
+        except Exception as e:
+            print(f"Error reading legacy audit log: {e}")
+        self._conn.executemany(
+            "INSERT INTO audit (candidate_id, ts, user, field, event) VALUES (?, ?, ?, ?, ?)",
+            [self._audit_row(candidate_id, event) for candidate_id, event in events if candidate_id]
+        )
+    
+    @staticmethod
+    def _context_row(candidate_id: str, ctx: Dict[str, Any]) -> tuple:
+        return (candidate_id, dumps_json(ctx).decode(), ctx.get("state"), ctx.get("updated_at"))
+    
+    @staticmethod
+    def _audit_row(candidate_id: str, event: AuditEvent) -> tuple:
+        return (candidate_id, event.timestamp, event.user, event.field, dumps_json(event).decode())
     
     def _load_contexts(self) -> Dict[str, Any]:
-        """Load all contexts from file."""
+        """Load all contexts from the database."""
         try:
-            with open(self.contexts_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
+            with self._lock:
+                rows = self._conn.execute("SELECT candidate_id, data FROM contexts").fetchall()
+            return {candidate_id: orjson.loads(data) for candidate_id, data in rows}
+        except Exception as e:
+            print(f"Error loading contexts: {e}")
             return {}
     
-    def _save_contexts(self, contexts: Dict[str, Any]):
-        """Save all contexts to file."""
+    def _save_contexts(self):
+        """Write changed and deleted contexts, plus pending audit events, in one transaction."""
         try:
-            with open(self.contexts_file, 'w', encoding='utf-8') as f:
-                json.dump(contexts, f, indent=2, default=str)
+            with self._conn:
+                if self._dirty_ids:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO contexts (candidate_id, data, state, updated_at) VALUES (?, ?, ?, ?)",
+                        [self._context_row(cid, self._contexts[cid]) for cid in self._dirty_ids if cid in self._contexts]
+                    )
+                if self._deleted_ids:
+                    self._conn.executemany(
+                        "DELETE FROM contexts WHERE candidate_id = ?",
+                        [(cid,) for cid in self._deleted_ids]
+                    )
+                if self._pending_audit:
+                    self._conn.executemany(
+                        "INSERT INTO audit (candidate_id, ts, user, field, event) VALUES (?, ?, ?, ?, ?)",
+                        self._pending_audit
+                    )
+            self._dirty_ids.clear()
+            self._deleted_ids.clear()
+            self._pending_audit.clear()
         except Exception as e:
             print(f"Error saving contexts: {e}")
     
-    def _load_audit_log(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Load audit log."""
+    def _load_audit_log(self) -> Dict[str, List[AuditEvent]]:
+        """Load audit log from the database, grouped by candidate."""
+        audit_log: Dict[str, List[AuditEvent]] = {}
         try:
-            with open(self.audit_log_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Ensure it's a dict (not a list)
-                if isinstance(data, list):
-                    return {}
-                return data if isinstance(data, dict) else {}
-        except Exception:
+            with self._lock:
+                rows = self._conn.execute("SELECT candidate_id, event FROM audit ORDER BY id").fetchall()
+            for candidate_id, event in rows:
+                audit_log.setdefault(candidate_id, []).append(AuditEvent.from_dict(orjson.loads(event)))
+        except Exception as e:
+            print(f"Error loading audit log: {e}")
             return {}
+        return audit_log
     
-    def _save_audit_log(self, audit_log: Dict[str, List[Dict[str, Any]]]):
-        """Save audit log."""
-        try:
-            with open(self.audit_log_file, 'w', encoding='utf-8') as f:
-                json.dump(audit_log, f, indent=2, default=str)
-        except Exception as e:
-            print(f"Error saving audit log: {e}")
+    def _append_audit_events(self, candidate_id: str, events: List[AuditEvent]):
+        """Record audit events in memory and queue them for the next flush."""
+        if not events:
+            return
+        self._get_audit_log().setdefault(candidate_id, []).extend(events)
+        self._pending_audit.extend(self._audit_row(candidate_id, event) for event in events)
+    
+    def _mark_dirty(self, candidate_id: str):
+        self._dirty_ids.add(candidate_id)
+        self._deleted_ids.discard(candidate_id)
+    
+    def _get_contexts(self) -> Dict[str, Any]:
+        """Return the in-memory contexts, loading them from the database on first use."""
+        if self._contexts is None:
+            with self._lock:
+                if self._contexts is None:
+                    self._contexts = self._load_contexts()
+        return self._contexts
+    
+    def _get_audit_log(self) -> Dict[str, List[AuditEvent]]:
+        """Return the in-memory audit log, loading it from the database on first use."""
+        if self._audit_log is None:
+            with self._lock:
+                if self._audit_log is None:
+                    self._audit_log = self._load_audit_log()
+        return self._audit_log
+    
+    def flush(self):
+        """Write any in-memory changes back to the database."""
+        with self._lock:
+            if self._dirty_ids or self._deleted_ids or self._pending_audit:
+                self._save_contexts()
     
     def get_context(self, candidate_id: str) -> Optional[CandidateContext]:
         """Get context for a candidate."""
-        contexts = self._load_contexts()
-        if candidate_id not in contexts:
+        contexts = self._get_contexts()
+        # Published records are replaced, never mutated, so the one taken under the
+        # lock stays consistent while it is converted
+        with self._lock:
+            ctx_data = contexts.get(candidate_id)
+        if ctx_data is None:
             return None
         
         try:
-            ctx_data = contexts[candidate_id]
-            # Ensure candidate_id is set
-            ctx_data["candidate_id"] = candidate_id
-            return CandidateContext(**ctx_data)
+            return _construct_context(candidate_id, ctx_data)
         except Exception as e:
             print(f"Error loading context for {candidate_id}: {e}")
             return None
@@ -95,227 +335,244 @@ class ContextStore:
         if not candidate_id:
             return
         
-        contexts = self._load_contexts()
-        
-        # Get existing context or create new
-        existing = contexts.get(candidate_id, {})
-        is_new_candidate = len(existing) == 0
-        
-        # Define core fields that should be replaced (not merged)
-        core_fields = {"job_title", "job_level", "location", "job_family", "interview_feedback"}
+        # One timestamp for the whole save, including its audit entries
+        now_iso = datetime.now(timezone.utc).isoformat()
         
-        # Define additional fields that should always be merged (not replaced)
-        additional_fields = {"proficiency", "additional_data", "counter_offer", "competing_offer", 
-                            "equity_request", "joining_bonus", "candidate_feedback", "notes"}
-        
-        # Determine if we should replace core fields or merge everything
-        if replace_existing and not is_new_candidate:
-            # Replace core fields but merge additional fields
-            original_created_at = existing.get("created_at")
-            original_created_by = existing.get("created_by")
+        with self._lock:
+            contexts = self._get_contexts()
             
-            # Start with existing context
-            updated = {**existing}
+            # Merge into a shallow copy of the cached record (a new candidate starts
+            # from an empty one); the copy is published with a single assignment
+            # below, so readers never see a half-merged record and a failure partway
+            # through leaves the cache untouched
+            updated = dict(contexts.get(candidate_id) or {})
+            is_new_candidate = len(updated) == 0
             
-            # Replace core fields from context_data
-            for field in core_fields:
-                if field in context_data:
-                    updated[field] = context_data[field]
+            # Determine if we should replace core fields or merge everything
+            replacing = replace_existing and not is_new_candidate
             
-            # Merge additional fields (deep merge for additional_data dict)
-            for field in additional_fields:
-                if field in context_data:
-                    if field == "additional_data" and isinstance(updated.get(field), dict) and isinstance(context_data[field], dict):
-                        # Deep merge for additional_data
-                        updated[field] = {**updated.get(field, {}), **context_data[field]}
-                    else:
-                        # For other additional fields, merge (prefer new value if provided)
-                        updated[field] = context_data[field]
+            # Values the audit and replacement logic compare against once the merge is done
+            original_created_at = updated.get("created_at")
+            original_created_by = updated.get("created_by")
+            original_metadata = {key: updated.get(key) for key in _AUDITED_METADATA_FIELDS}
             
-            # Also merge any other fields not in core or additional (like recommendation_history)
+            # Single pass over the incoming fields; FIELD_POLICY decides how each one
+            # combines with the stored value. When replacing, creation metadata,
+            # timestamps and state are never taken from context_data. The loop also
+            # records what it changed, so only those fields are audited.
+            changes: Dict[str, tuple] = {}
+            skipped = _REPLACE_PROTECTED_FIELDS if replacing else frozenset()
             for key, value in context_data.items():
-                if key not in core_fields and key not in additional_fields and key not in ["candidate_id", "created_at", "created_by", "updated_at", "updated_by", "state"]:
-                    if key == "recommendation_history" and isinstance(updated.get(key), list) and isinstance(value, list):
-                        # For recommendation_history, append new items
-                        updated[key] = updated.get(key, []) + value
-                    else:
-                        updated[key] = value
-            
-            updated["candidate_id"] = candidate_id
-            updated["updated_at"] = datetime.now(timezone.utc).isoformat()
-            if updated_by:
-                updated["updated_by"] = updated_by
-            
-            # Preserve original creation metadata
-            if original_created_at:
-                updated["created_at"] = original_created_at
-            else:
-                updated["created_at"] = datetime.now(timezone.utc).isoformat()
+                if key in skipped:
+                    continue
+                old_value = updated.get(key)
+                new_value = FIELD_POLICY.get(key, _replace_value)(old_value, value)
+                updated[key] = new_value
+                if key not in _UNAUDITED_FIELDS and old_value != new_value:
+                    changes[key] = (old_value, new_value)
             
-            if original_created_by:
-                updated["created_by"] = original_created_by
-            
-            # Ensure state exists
-            if "state" not in updated:
-                updated["state"] = CandidateState.ACTIVE.value
-            
-            # Log replacement if different user
-            if original_created_by and updated_by and original_created_by != updated_by:
-                self._log_context_replacement(
-                    candidate_id,
-                    existing,
-                    updated,
-                    original_created_by,
-                    updated_by
-                )
+            if replacing:
+                updated["candidate_id"] = candidate_id
+                updated["updated_at"] = now_iso
+                if updated_by:
+                    updated["updated_by"] = updated_by
+                
+                # Preserve original creation metadata
+                if original_created_at:
+                    updated["created_at"] = original_created_at
+                else:
+                    updated["created_at"] = now_iso
+                
+                if original_created_by:
+                    updated["created_by"] = original_created_by
+                
+                # Ensure state exists
+                if "state" not in updated:
+                    updated["state"] = CandidateState.ACTIVE.value
+                
+                # Log replacement if different user
+                if original_created_by and updated_by and original_created_by != updated_by:
+                    self._log_context_replacement(
+                        candidate_id,
+                        original_created_by,
+                        updated_by,
+                        now_iso
+                    )
+                else:
+                    # Still log as field changes (created_by is preserved, so never among them)
+                    changes.update(_diff_fields(original_metadata, updated, _AUDITED_METADATA_FIELDS))
+                    self._log_context_changes(candidate_id, changes, updated_by, now_iso)
             else:
-                # Still log as field changes, but exclude created_by from tracking
-                self._log_context_changes(candidate_id, existing, updated, updated_by, is_replacement=True)
-        else:
-            # Merge new data (default behavior) - but still handle additional_data specially
-            updated = {**existing}
+                updated["candidate_id"] = candidate_id
+                updated["updated_at"] = now_iso
+                if updated_by:
+                    updated["updated_by"] = updated_by
+                
+                # For new candidates, set created_by
+                if is_new_candidate:
+                    updated["created_by"] = updated_by or "system"
+                
+                # Ensure created_at exists
+                if "created_at" not in updated:
+                    updated["created_at"] = now_iso
+                
+                # Ensure state exists
+                if "state" not in updated:
+                    updated["state"] = CandidateState.ACTIVE.value
+                
+                # Log changes to audit log
+                changes.update(_diff_fields(original_metadata, updated, _AUDITED_METADATA_FIELDS))
+                self._log_context_changes(candidate_id, changes, updated_by, now_iso)
             
-            # Merge all fields, with special handling for additional_data
-            for key, value in context_data.items():
-                if key == "additional_data" and isinstance(updated.get(key), dict) and isinstance(value, dict):
-                    # Deep merge for additional_data
-                    updated[key] = {**updated.get(key, {}), **value}
-                elif key == "recommendation_history" and isinstance(updated.get(key), list) and isinstance(value, list):
-                    # Append new recommendation history items
-                    updated[key] = updated.get(key, []) + value
-                else:
-                    # Regular merge (new values override existing)
-                    updated[key] = value
+            # Publish the merged record and save
+            contexts[candidate_id] = updated
+            self._mark_dirty(candidate_id)
+            self.flush()
+    
+    def append_recommendation(
+        self,
+        candidate_id: str,
+        item: RecommendationHistoryItem,
+        updated_by: Optional[str] = None,
+        recommendation: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Append a recommendation to a candidate's stored history.
+        
+        The read, append and write happen under one hold of the store lock, so a
+        concurrent save of the same candidate can't be overwritten by a stale copy.
+        Only recommendation_history (and the latest recommendation, if given) change.
+        
+        Args:
+            candidate_id: The candidate ID
+            item: The history entry to append
+            updated_by: User making the update
+            recommendation: Latest recommendation to store alongside the history
+        
+        Returns:
+            False if the candidate has no stored context
+        """
+        now_iso = datetime.now(timezone.utc).isoformat()
+        
+        with self._lock:
+            contexts = self._get_contexts()
+            existing = contexts.get(candidate_id)
+            if existing is None:
+                return False
             
-            updated["candidate_id"] = candidate_id
-            updated["updated_at"] = datetime.now(timezone.utc).isoformat()
+            updated = dict(existing)
+            updated["recommendation_history"] = [
+                *(existing.get("recommendation_history") or []),
+                orjson.loads(item.model_dump_json())
+            ]
+            if recommendation is not None:
+                updated["recommendation"] = recommendation
+            updated["updated_at"] = now_iso
             if updated_by:
                 updated["updated_by"] = updated_by
             
-            # For new candidates, set created_by
-            if is_new_candidate:
-                updated["created_by"] = updated_by or "system"
-            
-            # Ensure created_at exists
-            if "created_at" not in updated:
-                updated["created_at"] = datetime.now(timezone.utc).isoformat()
+            self._log_context_changes(
+                candidate_id,
+                _diff_fields(existing, updated, ("recommendation_history", "recommendation", "updated_by")),
+                updated_by,
+                now_iso
+            )
             
-            # Ensure state exists
-            if "state" not in updated:
-                updated["state"] = CandidateState.ACTIVE.value
-            
-            # Log changes to audit log
-            self._log_context_changes(candidate_id, existing, updated, updated_by, is_replacement=False)
-        
-        # Save
-        contexts[candidate_id] = updated
-        self._save_contexts(contexts)
+            contexts[candidate_id] = updated
+            self._mark_dirty(candidate_id)
+            self.flush()
+            return True
     
     def _log_context_changes(
         self,
         candidate_id: str,
-        old_data: Dict[str, Any],
-        new_data: Dict[str, Any],
+        changes: Dict[str, tuple],
         updated_by: Optional[str],
-        is_replacement: bool = False
+        now_iso: str
     ):
-        """Log context changes to audit log."""
-        audit_log = self._load_audit_log()
-        
-        if candidate_id not in audit_log:
-            audit_log[candidate_id] = []
+        """Log context changes (field -> (old, new)) to audit log.
         
-        # Track field changes
-        excluded_fields = ["updated_at", "created_at", "candidate_id"]
-        # During replacement, exclude created_by from field change tracking
-        # (it's handled separately by _log_context_replacement)
-        if is_replacement:
-            excluded_fields.append("created_by")
-        
-        for key, new_value in new_data.items():
-            if key in excluded_fields:
-                continue
-            old_value = old_data.get(key)
-            if old_value != new_value:
-                audit_log[candidate_id].append({
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "user": updated_by or "system",
-                    "field": key,
-                    "old_value": old_value,
-                    "new_value": new_value
-                })
+        The events are only queued; the caller's flush commits them in the same
+        transaction as the context row they describe.
+        """
+        user = updated_by or "system"
+        events = [
+            AuditEvent(now_iso, user, key, old_value, new_value)
+            for key, (old_value, new_value) in changes.items()
+        ]
         
-        self._save_audit_log(audit_log)
+        self._append_audit_events(candidate_id, events)
     
     def _log_context_replacement(
         self,
         candidate_id: str,
-        old_data: Dict[str, Any],
-        new_data: Dict[str, Any],
         original_creator: str,
-        replacing_user: str
+        replacing_user: str,
+        now_iso: str
     ):
-        """Log when an entire context is replaced by a different user."""
-        audit_log = self._load_audit_log()
-        
-        if candidate_id not in audit_log:
-            audit_log[candidate_id] = []
-        
+        """Log when an entire context is replaced by a different user (committed by the caller's flush)."""
         # Log the replacement event
-        audit_log[candidate_id].append({
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "user": replacing_user,
-            "field": "context_replacement",
-            "old_value": f"Context created by {original_creator}",
-            "new_value": f"Context replaced by {replacing_user}",
-            "original_creator": original_creator,
-            "replacing_user": replacing_user,
-            "replacement_type": "full_context_replacement"
-        })
-        
-        self._save_audit_log(audit_log)
+        self._append_audit_events(candidate_id, [AuditEvent(
+            timestamp=now_iso,
+            user=replacing_user,
+            field="context_replacement",
+            old_value=f"Context created by {original_creator}",
+            new_value=f"Context replaced by {replacing_user}",
+            original_creator=original_creator,
+            replacing_user=replacing_user,
+            replacement_type="full_context_replacement"
+        )])
     
     def reset_context(self, candidate_id: str, updated_by: str) -> bool:
         """Reset context for a candidate."""
-        contexts = self._load_contexts()
-        if candidate_id not in contexts:
-            return False
-        
-        # Delete context
-        del contexts[candidate_id]
-        self._save_contexts(contexts)
-        
-        # Log reset
-        audit_log = self._load_audit_log()
-        if candidate_id not in audit_log:
-            audit_log[candidate_id] = []
-        audit_log[candidate_id].append({
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "user": updated_by,
-            "field": "reset",
-            "old_value": "exists",
-            "new_value": "deleted"
-        })
-        self._save_audit_log(audit_log)
-        
-        return True
+        now_iso = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            contexts = self._get_contexts()
+            if candidate_id not in contexts:
+                return False
+            
+            # Delete context
+            del contexts[candidate_id]
+            self._dirty_ids.discard(candidate_id)
+            self._deleted_ids.add(candidate_id)
+            
+            # Log reset
+            self._append_audit_events(candidate_id, [AuditEvent(
+                timestamp=now_iso,
+                user=updated_by,
+                field="reset",
+                old_value="exists",
+                new_value="deleted"
+            )])
+            self.flush()
+            
+            return True
     
     def get_audit_log(self, candidate_id: str) -> List[Dict[str, Any]]:
         """Get audit log for a candidate."""
-        audit_log = self._load_audit_log()
-        return audit_log.get(candidate_id, [])
+        audit_log = self._get_audit_log()
+        with self._lock:
+            events = list(audit_log.get(candidate_id, []))
+        return [event.to_dict() for event in events]
     
     def get_active_candidates(self, user_email: str) -> List[CandidateContext]:
         """Get active candidates for a user."""
-        contexts = self._load_contexts()
+        contexts = self._get_contexts()
         active = []
         
-        for candidate_id, ctx_data in contexts.items():
+        # Snapshot under the lock; saves may be replacing records from another thread
+        with self._lock:
+            items = list(contexts.items())
+        
+        for candidate_id, ctx_data in items:
+            # Filter on the raw state first so only matching rows are validated
+            # (a missing state means the model default, active)
+            if ctx_data.get("state", CandidateState.ACTIVE.value) != CandidateState.ACTIVE.value:
+                continue
             try:
-                ctx = CandidateContext(candidate_id=candidate_id, **ctx_data)
-                if ctx.state == CandidateState.ACTIVE:
-                    # Check if user has access (for now, all users see all candidates)
-                    active.append(ctx)
+                # Stored rows carry their own candidate_id; the dict key wins
+                ctx = _construct_context(candidate_id, ctx_data)
+                # Check if user has access (for now, all users see all candidates)
+                active.append(ctx)
             except Exception:
                 continue
         
@@ -323,14 +580,18 @@ class ContextStore:
     
     def get_closed_candidates(self, user_email: str) -> List[CandidateContext]:
         """Get closed candidates for a user."""
-        contexts = self._load_contexts()
+        contexts = self._get_contexts()
         closed = []
         
-        for candidate_id, ctx_data in contexts.items():
+        # Snapshot under the lock; saves may be replacing records from another thread
+        with self._lock:
+            items = list(contexts.items())
+        
+        for candidate_id, ctx_data in items:
+            if ctx_data.get("state") != CandidateState.CLOSED.value:
+                continue
             try:
-                ctx = CandidateContext(candidate_id=candidate_id, **ctx_data)
-                if ctx.state == CandidateState.CLOSED:
-                    closed.append(ctx)
+                closed.append(_construct_context(candidate_id, ctx_data))
             except Exception:
                 continue
         
@@ -1,66 +1,107 @@
 """User context storage for tracking current candidate."""
-import json
+import atexit
+import threading
 from pathlib import Path
 from typing import Optional
 from datetime import datetime, timezone
 from models import UserContext
 from config import DATA_DIR
+from utils.file_io import atomic_write_json, read_json
+
+
+# Writes landing within this window are coalesced into a single file write
+FLUSH_DELAY_SECONDS = 0.05
 
 
 class UserContextStore:
-    """Store user's current candidate context."""
+    """Store user's current candidate context.
+    
+    The in-memory dict is authoritative; changes are written to disk by a short
+    debounce timer (and on exit), so rapid candidate switches cost one write.
+    """
     
     def __init__(self, data_dir: Path = None):
         self.data_dir = data_dir or DATA_DIR
         self.user_contexts_file = self.data_dir / "user_contexts.json"
         self._ensure_file_exists()
+        self._lock = threading.Lock()
+        # Serializes file writes so a newer snapshot is never overwritten by an older one
+        self._write_lock = threading.Lock()
+        self._data = self._load_user_contexts()
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
     
     def _ensure_file_exists(self):
         """Ensure user contexts file exists."""
         if not self.user_contexts_file.exists():
-            with open(self.user_contexts_file, 'w', encoding='utf-8') as f:
-                json.dump({}, f)
+            atomic_write_json(self.user_contexts_file, {})
     
     def _load_user_contexts(self) -> dict:
         """Load all user contexts."""
         try:
-            with open(self.user_contexts_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json(self.user_contexts_file)
         except Exception:
             return {}
     
     def _save_user_contexts(self, user_contexts: dict):
         """Save all user contexts."""
         try:
-            with open(self.user_contexts_file, 'w', encoding='utf-8') as f:
-                json.dump(user_contexts, f, indent=2, default=str)
+            atomic_write_json(self.user_contexts_file, user_contexts)
         except Exception as e:
             print(f"Error saving user contexts: {e}")
     
+    def _schedule_flush(self):
+        """(Re)start the debounce timer; caller must hold the lock."""
+        self._dirty = True
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(FLUSH_DELAY_SECONDS, self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+    
+    def flush(self):
+        """Write pending changes to disk now.
+        
+        Only the snapshot is taken under the lock; the file write happens outside it,
+        so lookups and updates on the event loop never wait on disk.
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not self._dirty:
+                    return
+                # Per-user dicts are updated in place, so copy them too (the data is small)
+                snapshot = {email: dict(user_ctx) for email, user_ctx in self._data.items()}
+                self._dirty = False
+            self._save_user_contexts(snapshot)
+    
     def get_current_candidate(self, user_email: str) -> Optional[str]:
         """Get user's current candidate ID."""
-        user_contexts = self._load_user_contexts()
-        user_ctx = user_contexts.get(user_email)
-        if user_ctx:
-            return user_ctx.get("current_candidate_id")
+        with self._lock:
+            user_ctx = self._data.get(user_email)
+            if user_ctx:
+                return user_ctx.get("current_candidate_id")
         return None
     
     def set_current_candidate(self, user_email: str, candidate_id: Optional[str]):
         """Set user's current candidate ID."""
-        user_contexts = self._load_user_contexts()
-        
-        if user_email not in user_contexts:
-            user_contexts[user_email] = {
-                "user_email": user_email,
-                "current_candidate_id": None,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
-            }
-        
-        user_contexts[user_email]["current_candidate_id"] = candidate_id
-        user_contexts[user_email]["updated_at"] = datetime.now(timezone.utc).isoformat()
-        
-        self._save_user_contexts(user_contexts)
+        now_iso = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            if user_email not in self._data:
+                self._data[user_email] = {
+                    "user_email": user_email,
+                    "current_candidate_id": None,
+                    "created_at": now_iso,
+                    "updated_at": now_iso
+                }
+            
+            self._data[user_email]["current_candidate_id"] = candidate_id
+            self._data[user_email]["updated_at"] = now_iso
+            
+            self._schedule_flush()
     
     def clear_current_candidate(self, user_email: str):
         """Clear user's current candidate."""
@@ -0,0 +1,83 @@
+"""Shared configuration for the sample data generators.
+
+Read-only (MappingProxyType) so both generator scripts can share one copy safely.
+"""
+from types import MappingProxyType
+from typing import Any, Mapping
+
+# Locations with Cost of Living Multipliers
+LOCATIONS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    'LAX': MappingProxyType({'currency': 'USD', 'symbol': '$', 'multiplier': 1.25}),
+    'DUB': MappingProxyType({'currency': 'EUR', 'symbol': '€', 'multiplier': 0.90}),
+    'STL': MappingProxyType({'currency': 'USD', 'symbol': '$', 'multiplier': 0.85}),
+    'SHA': MappingProxyType({'currency': 'CNY', 'symbol': '¥', 'multiplier': 3.80}),
+    'SYD': MappingProxyType({'currency': 'AUD', 'symbol': '$', 'multiplier': 1.35}),
+    'SIN': MappingProxyType({'currency': 'SGD', 'symbol': '$', 'multiplier': 1.45}),
+    'SEA': MappingProxyType({'currency': 'USD', 'symbol': '$', 'multiplier': 1.30})
+})
+
+# Job Families
+JOB_FAMILIES: Mapping[str, Mapping[str, int]] = MappingProxyType({
+    'Engineering': MappingProxyType({
+        'Software Engineer': 115000,
+        'Senior Software Engineer': 165000,
+        'Staff Engineer': 210000,
+        'Data Scientist': 125000,
+        'Data Analyst': 85000,
+        'DevOps Engineer': 130000,
+        'UX Designer': 110000,
+        'UI Designer': 95000,
+        'Product Manager': 135000,
+        'QA Engineer': 90000,
+        'System Administrator': 85000,
+        'Network Engineer': 100000,
+        'Security Analyst': 115000,
+        'Cloud Architect': 160000,
+        'Frontend Developer': 110000,
+        'Backend Developer': 115000,
+        'Mobile Developer': 120000,
+        'Tech Lead': 180000,
+        'Engineering Manager': 195000,
+        'Director of Engineering': 230000
+    }),
+    'Sales': MappingProxyType({
+        'Sales Representative': 65000,
+        'Account Executive': 95000,
+        'Sales Manager': 140000,
+        'VP of Sales': 210000,
+        'Customer Success Manager': 80000,
+        'Customer Support Lead': 65000
+    }),
+    'Marketing': MappingProxyType({
+        'Marketing Manager': 100000,
+        'Brand Manager': 110000,
+        'Content Strategist': 85000,
+        'SEO Specialist': 75000,
+        'Social Media Manager': 70000
+    }),
+    'HR': MappingProxyType({
+        'HR Generalist': 75000,
+        'Recruiter': 80000,
+        'HR Business Partner': 110000
+    }),
+    'Finance': MappingProxyType({
+        'Business Analyst': 95000,
+        'Financial Analyst': 90000,
+        'Controller': 130000,
+        'Accountant': 75000
+    }),
+    'Operations': MappingProxyType({
+        'Office Manager': 60000,
+        'Executive Assistant': 80000,
+        'Operations Manager': 105000,
+        'Operations Coordinator': 55000,
+        'Procurement Specialist': 85000
+    }),
+    'Legal': MappingProxyType({
+        'Legal Counsel': 170000
+    }),
+    'Executive': MappingProxyType({
+        'Chief of Staff': 180000,
+        'Project Manager': 105000
+    })
+})
@@ -1,9 +1,20 @@
 """Data access layer for CSV files and metadata."""
+import threading
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, Optional, Set
+from typing import Dict, Any, Optional, Set, Tuple, List
 from models import MarketCompensation, InternalParity
 from config import COMP_RANGES_PATH, EMPLOYEE_ROSTER_PATH, DATA_DIR
+from utils.file_io import warm_page_cache
+
+
+# Explicit column types so the pyarrow reader skips inference on the numeric columns
+COMP_RANGES_DTYPES = {"Min": "float64", "Max": "float64"}
+
+
+def _read_csv(path: Path, dtype: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Read a CSV with the multithreaded pyarrow engine."""
+    return pd.read_csv(path, engine="pyarrow", dtype=dtype)
 
 
 # Location examples for inference
@@ -28,32 +39,89 @@ class DataAccess:
         self._comp_ranges_df: Optional[pd.DataFrame] = None
         self._employee_roster_df: Optional[pd.DataFrame] = None
         self._metadata_cache: Optional[Dict[str, Any]] = None
+        self._metadata_mtime: Optional[float] = None
+        # (lowercased job title, uppercased location) -> row position(s)
+        self._comp_index: Dict[Tuple[str, str], int] = {}
+        self._parity: Dict[Tuple[str, str], Dict[str, float]] = {}
+        # Serializes (re)loads; each frame is published together with its index/aggregate
+        self._load_lock = threading.Lock()
+        # CSVs are parsed lazily on first lookup; start readahead now so they're cached by then
+        warm_page_cache(self.comp_ranges_path, self.employee_roster_path)
+    
+    @staticmethod
+    def _lookup_key(job_title: str, location: str) -> Tuple[str, str]:
+        """Normalize a job title / location pair for index lookups."""
+        return (job_title.strip().lower(), location.strip().upper())
+    
+    @classmethod
+    def _build_index(cls, df: pd.DataFrame) -> Dict[Tuple[str, str], List[int]]:
+        """Group row positions by normalized (Job Title, Location)."""
+        index: Dict[Tuple[str, str], List[int]] = {}
+        if df.empty or "Job Title" not in df.columns or "Location" not in df.columns:
+            return index
+        for i, (title, location) in enumerate(zip(df["Job Title"], df["Location"])):
+            if isinstance(title, str) and isinstance(location, str):
+                index.setdefault(cls._lookup_key(title, location), []).append(i)
+        return index
     
     def _load_comp_ranges(self) -> pd.DataFrame:
         """Load compensation ranges CSV."""
         if self._comp_ranges_df is None:
-            if self.comp_ranges_path.exists():
-                self._comp_ranges_df = pd.read_csv(self.comp_ranges_path)
-            else:
-                self._comp_ranges_df = pd.DataFrame()
+            with self._load_lock:
+                if self._comp_ranges_df is None:
+                    if self.comp_ranges_path.exists():
+                        df = _read_csv(self.comp_ranges_path, COMP_RANGES_DTYPES)
+                    else:
+                        df = pd.DataFrame()
+                    # First row wins, matching the previous exact-match lookup
+                    self._comp_index = {key: rows[0] for key, rows in self._build_index(df).items()}
+                    self._comp_ranges_df = df
         return self._comp_ranges_df
     
-    def _load_employee_roster(self) -> pd.DataFrame:
-        """Load employee roster CSV."""
-        if self._employee_roster_df is None:
-            if self.employee_roster_path.exists():
-                self._employee_roster_df = pd.read_csv(self.employee_roster_path)
-            else:
-                self._employee_roster_df = pd.DataFrame()
+    def _load_employee_roster(self, reload: bool = False) -> pd.DataFrame:
+        """Load employee roster CSV (again, if reload is set)."""
+        if self._employee_roster_df is None or reload:
+            with self._load_lock:
+                if self._employee_roster_df is None or reload:
+                    if self.employee_roster_path.exists():
+                        df = _read_csv(self.employee_roster_path)
+                    else:
+                        df = pd.DataFrame()
+                    self._parity = self._aggregate_parity(df)
+                    self._employee_roster_df = df
         return self._employee_roster_df
     
+    @staticmethod
+    def _aggregate_parity(df: pd.DataFrame) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """Pre-compute compensation min/max/count per normalized (Job Title, Location)."""
+        # Generated rosters carry a numeric Salary column; older ones only Compensation
+        compensation_column = "Salary" if "Salary" in df.columns else "Compensation"
+        required = {"Job Title", "Location", compensation_column}
+        if df.empty or not required.issubset(df.columns):
+            return {}
+        compensations = pd.to_numeric(df[compensation_column], errors="coerce")
+        titles = df["Job Title"].astype("string").str.strip().str.lower()
+        locations = df["Location"].astype("string").str.strip().str.upper()
+        stats = compensations.groupby([titles, locations]).agg(["min", "max", "count"])
+        stats = stats[stats["count"] > 0]
+        return stats.to_dict("index")
+    
+    def _roster_mtime(self) -> Optional[float]:
+        """Modification time of the employee roster, or None if it is missing."""
+        try:
+            return self.employee_roster_path.stat().st_mtime
+        except OSError:
+            return None
+    
     def get_metadata(self) -> Dict[str, Any]:
         """Get metadata for job families, locations, job titles, etc."""
-        if self._metadata_cache is not None:
+        roster_mtime = self._roster_mtime()
+        if self._metadata_cache is not None and roster_mtime == self._metadata_mtime:
             return self._metadata_cache
         
         comp_ranges = self._load_comp_ranges()
-        employee_roster = self._load_employee_roster()
+        # Roster changed on disk since the cache was built - reload it
+        employee_roster = self._load_employee_roster(reload=self._metadata_cache is not None)
         
         # Extract unique locations
         locations = set()
@@ -84,11 +152,10 @@ class DataAccess:
         job_title_to_family = {}
         if not employee_roster.empty:
             if "Job Title" in employee_roster.columns and "Job Family" in employee_roster.columns:
-                for _, row in employee_roster.iterrows():
-                    title = row.get("Job Title")
-                    family = row.get("Job Family")
-                    if pd.notna(title) and pd.notna(family):
-                        job_title_to_family[str(title)] = str(family)
+                sub = employee_roster[["Job Title", "Job Family"]].dropna()
+                job_title_to_family = dict(zip(
+                    sub["Job Title"].astype(str), sub["Job Family"].astype(str)
+                ))
         
         metadata = {
             "locations": sorted(list(locations)),
@@ -99,6 +166,7 @@ class DataAccess:
         }
         
         self._metadata_cache = metadata
+        self._metadata_mtime = roster_mtime
         return metadata
     
     def get_market_compensation(self, job_title: str, location: str) -> Optional[MarketCompensation]:
@@ -109,15 +177,11 @@ class DataAccess:
             return None
         
         # Exact match on Job Title and Location
-        match = comp_ranges[
-            (comp_ranges["Job Title"].str.strip().str.lower() == job_title.strip().lower()) &
-            (comp_ranges["Location"].str.strip().str.upper() == location.strip().upper())
-        ]
-        
-        if match.empty:
+        position = self._comp_index.get(self._lookup_key(job_title, location))
+        if position is None:
             return None
         
-        row = match.iloc[0]
+        row = comp_ranges.iloc[position]
         
         return MarketCompensation(
             currency=str(row.get("Currency", "USD")),
@@ -134,31 +198,15 @@ class DataAccess:
             return None
         
         # Exact match on Job Title and Location
-        match = employee_roster[
-            (employee_roster["Job Title"].str.strip().str.lower() == job_title.strip().lower()) &
-            (employee_roster["Location"].str.strip().str.upper() == location.strip().upper())
-        ]
-        
-        if match.empty:
+        stats = self._parity.get(self._lookup_key(job_title, location))
+        if stats is None:
             return None
         
-        # Extract compensation values
-        if "Compensation" in match.columns:
-            compensations = match["Compensation"].dropna()
-            if compensations.empty:
-                return None
-            
-            compensations_numeric = pd.to_numeric(compensations, errors='coerce').dropna()
-            if compensations_numeric.empty:
-                return None
-            
-            return InternalParity(
-                min=float(compensations_numeric.min()),
-                max=float(compensations_numeric.max()),
-                count=int(len(compensations_numeric))
-            )
-        
-        return None
+        return InternalParity(
+            min=float(stats["min"]),
+            max=float(stats["max"]),
+            count=int(stats["count"])
+        )
 
 
 # Singleton instance - will be initialized with correct paths from config
@@ -1,89 +1,32 @@
+import numpy as np
 import pandas as pd
-import random
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 from faker import Faker
 
-fake = Faker()
+from _config import LOCATIONS, JOB_FAMILIES
 
 # --- CONFIGURATION ---
+SEED = 42  # Seeds every random draw (NumPy and Faker) so reruns produce the same files
 NUM_EMPLOYEES_PER_ROLE_LOCATION = 10  # Number of employees per role-location combination
 OUTLIER_CHANCE = 0.05  # 5% Low, 5% High
+NAME_POOL_SIZE = 2000  # Distinct first and last names to combine into employee names
+
+# One seeded generator for all sampling
+rng = np.random.default_rng(SEED)
+Faker.seed(SEED)
+fake = Faker()
 
-# Locations with Cost of Living Multipliers
-LOCATIONS = {
-    'LAX': {'currency': 'USD', 'symbol': '$', 'multiplier': 1.25},
-    'DUB': {'currency': 'EUR', 'symbol': '€', 'multiplier': 0.90},
-    'STL': {'currency': 'USD', 'symbol': '$', 'multiplier': 0.85},
-    'SHA': {'currency': 'CNY', 'symbol': '¥', 'multiplier': 3.80},
-    'SYD': {'currency': 'AUD', 'symbol': '$', 'multiplier': 1.35},
-    'SIN': {'currency': 'SGD', 'symbol': '$', 'multiplier': 1.45},
-    'SEA': {'currency': 'USD', 'symbol': '$', 'multiplier': 1.30}
-}
-
-# Job Families
-JOB_FAMILIES = {
-    'Engineering': {
-        'Software Engineer': 115000,
-        'Senior Software Engineer': 165000,
-        'Staff Engineer': 210000,
-        'Data Scientist': 125000,
-        'Data Analyst': 85000,
-        'DevOps Engineer': 130000,
-        'UX Designer': 110000,
-        'UI Designer': 95000,
-        'Product Manager': 135000,
-        'QA Engineer': 90000,
-        'System Administrator': 85000,
-        'Network Engineer': 100000,
-        'Security Analyst': 115000,
-        'Cloud Architect': 160000,
-        'Frontend Developer': 110000,
-        'Backend Developer': 115000,
-        'Mobile Developer': 120000,
-        'Tech Lead': 180000,
-        'Engineering Manager': 195000,
-        'Director of Engineering': 230000
-    },
-    'Sales': {
-        'Sales Representative': 65000,
-        'Account Executive': 95000,
-        'Sales Manager': 140000,
-        'VP of Sales': 210000,
-        'Customer Success Manager': 80000,
-        'Customer Support Lead': 65000
-    },
-    'Marketing': {
-        'Marketing Manager': 100000,
-        'Brand Manager': 110000,
-        'Content Strategist': 85000,
-        'SEO Specialist': 75000,
-        'Social Media Manager': 70000
-    },
-    'HR': {
-        'HR Generalist': 75000,
-        'Recruiter': 80000,
-        'HR Business Partner': 110000
-    },
-    'Finance': {
-        'Business Analyst': 95000,
-        'Financial Analyst': 90000,
-        'Controller': 130000,
-        'Accountant': 75000
-    },
-    'Operations': {
-        'Office Manager': 60000,
-        'Executive Assistant': 80000,
-        'Operations Manager': 105000,
-        'Operations Coordinator': 55000,
-        'Procurement Specialist': 85000
-    },
-    'Legal': {
-        'Legal Counsel': 170000
-    },
-    'Executive': {
-        'Chief of Staff': 180000,
-        'Project Manager': 105000
-    }
-}
+# Proficiency tiers; employees carry an index into this array until the DataFrame is built
+PROFICIENCY_LEVELS = np.array(['Learning', 'Proficient', 'Advanced'], dtype=object)
+# Proficiency odds for outliers: low outliers lean Learning, high outliers lean Advanced
+LOW_OUTLIER_PROFICIENCY_P = [2 / 3, 1 / 3, 0]
+HIGH_OUTLIER_PROFICIENCY_P = [0, 1 / 3, 2 / 3]
+
+# Location lookup tables indexed by a location's position in LOCATIONS, so per-row
+# location data is an int8 index plus one gather instead of nested dict lookups
+LOC_CODES = np.array(list(LOCATIONS), dtype=object)
+SYMBOLS = np.array([LOCATIONS[code]['symbol'] for code in LOC_CODES], dtype=object)
 
 # Flatten all roles for easy access
 ALL_ROLES = {}
@@ -91,127 +34,160 @@ for job_family, roles in JOB_FAMILIES.items():
     for role, base_salary in roles.items():
         ALL_ROLES[role] = {'base_salary': base_salary, 'job_family': job_family}
 
+
+def sample_salaries(min_market, max_market):
+    """Sample a salary and proficiency index for every employee in one vectorized pass.
+    
+    min_market/max_market hold each employee's market band. OUTLIER_CHANCE of
+    employees land just below Min (SCENARIO A) or above Max (SCENARIO B); the rest
+    (SCENARIO C) are paid within the sub-band matching their proficiency.
+    """
+    count = len(min_market)
+    band_span = max_market - min_market
+    
+    rand_check = rng.random(count)
+    low = rand_check < OUTLIER_CHANCE  # SCENARIO A: LOW OUTLIER (Below Min)
+    high = rand_check > (1 - OUTLIER_CHANCE)  # SCENARIO B: HIGH OUTLIER (Above Max)
+    
+    # Proficiency index into PROFICIENCY_LEVELS; SCENARIO C (standard range) is uniform
+    proficiency = rng.integers(0, 3, count)
+    proficiency[low] = rng.choice(3, low.sum(), p=LOW_OUTLIER_PROFICIENCY_P)
+    proficiency[high] = rng.choice(3, high.sum(), p=HIGH_OUTLIER_PROFICIENCY_P)
+    
+    # Correlate Proficiency to Salary Band position:
+    # Learning bottom 40%, Proficient middle 40% (creates overlap), Advanced top 40%
+    sub_min = np.choose(proficiency, [
+        min_market,
+        (min_market + band_span * 0.30).astype(int),
+        (min_market + band_span * 0.60).astype(int)
+    ])
+    sub_max = np.choose(proficiency, [
+        (min_market + band_span * 0.40).astype(int),
+        (min_market + band_span * 0.70).astype(int),
+        max_market
+    ])
+    # Outliers fall just outside the band instead
+    sub_min = np.where(low, (min_market * 0.90).astype(int), np.where(high, (max_market * 1.01).astype(int), sub_min))
+    sub_max = np.where(low, (min_market * 0.99).astype(int), np.where(high, (max_market * 1.10).astype(int), sub_max))
+    
+    return rng.integers(sub_min, sub_max, endpoint=True), proficiency
+
+
+def write_csv(df, path):
+    """Write df to path as CSV using Arrow's multithreaded C++ writer."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pa_csv.write_csv(table, path, pa_csv.WriteOptions(quoting_style='needed'))
+
+
 # --- STEP 1: GENERATE MARKET RANGES FOR ALL COMBINATIONS ---
 print("Generating Market Ranges for ALL combinations...")
-market_rows = []
-
-# Generate market ranges for ALL role-location combinations
-for role, role_info in ALL_ROLES.items():
-    for loc_code, loc_meta in LOCATIONS.items():
-        base = role_info['base_salary'] * loc_meta['multiplier']
-        
-        # Range is Base +/- 15%
-        min_sal = int(base * 0.85 / 1000) * 1000
-        max_sal = int(base * 1.15 / 1000) * 1000
-        
-        market_rows.append({
-            'Job Title': role,
-            'Location': loc_code,
-            'Currency': loc_meta['currency'],
-            'Min': min_sal,
-            'Max': max_sal,
-            'Compensation Range': f"{loc_meta['symbol']}{min_sal:,} - {loc_meta['symbol']}{max_sal:,}"
-        })
-
-df_ranges = pd.DataFrame(market_rows)
-print(f"Generated {len(market_rows)} market range entries")
+# Generate market ranges for ALL role-location combinations at once: a roles x locations
+# matrix of base salaries, flattened role-major into one row per combination
+role_names = list(ALL_ROLES)
+role_salaries = np.array([role_info['base_salary'] for role_info in ALL_ROLES.values()])
+loc_multipliers = np.array([loc_meta['multiplier'] for loc_meta in LOCATIONS.values()])
+base = role_salaries[:, None] * loc_multipliers[None, :]
+
+# Range is Base +/- 15%
+range_mins = ((base * 0.85 / 1000).astype(np.int64) * 1000).ravel()
+range_maxs = ((base * 1.15 / 1000).astype(np.int64) * 1000).ravel()
+
+num_locations = len(LOC_CODES)
+range_titles = np.repeat(role_names, num_locations)
+range_loc_idx = np.tile(np.arange(num_locations, dtype=np.int8), len(role_names))
+range_locations = LOC_CODES[range_loc_idx]
+range_currencies = np.tile([LOCATIONS[code]['currency'] for code in LOC_CODES], len(role_names))
+range_symbols = SYMBOLS[range_loc_idx]
+range_labels = [
+    f"{symbol}{min_sal:,} - {symbol}{max_sal:,}"
+    for symbol, min_sal, max_sal in zip(range_symbols, range_mins.tolist(), range_maxs.tolist())
+]
+print(f"Generated {len(range_mins)} market range entries")
 
 # --- STEP 2: GENERATE EMPLOYEE ROSTER WITH JOB FAMILY ---
 print("Generating Employee Roster with Job Family...")
-employee_rows = []
-
-# Generate employees for each role-location combination
-for role, role_info in ALL_ROLES.items():
-    job_family = role_info['job_family']
-    
-    # Find market ranges for this role
-    role_market_ranges = df_ranges[df_ranges['Job Title'] == role]
-    
-    for _, market_range in role_market_ranges.iterrows():
-        location = market_range['Location']
-        min_market = market_range['Min']
-        max_market = market_range['Max']
-        band_span = max_market - min_market
-        symbol = LOCATIONS[location]['symbol']
-        
-        # Generate NUM_EMPLOYEES_PER_ROLE_LOCATION employees for this role-location combo
-        for _ in range(NUM_EMPLOYEES_PER_ROLE_LOCATION):
-            rand_check = random.random()
-            salary = 0
-            proficiency = ""
-
-            # -- SCENARIO A: LOW OUTLIER (Below Min) --
-            if rand_check < OUTLIER_CHANCE:
-                salary = random.randint(int(min_market * 0.90), int(min_market * 0.99))
-                proficiency = random.choice(['Learning', 'Learning', 'Proficient'])
-
-            # -- SCENARIO B: HIGH OUTLIER (Above Max) --
-            elif rand_check > (1 - OUTLIER_CHANCE):
-                salary = random.randint(int(max_market * 1.01), int(max_market * 1.10))
-                proficiency = random.choice(['Advanced', 'Advanced', 'Proficient'])
-
-            # -- SCENARIO C: STANDARD RANGE --
-            else:
-                proficiency = random.choice(['Learning', 'Proficient', 'Advanced'])
-
-                # Correlate Proficiency to Salary Band position
-                if proficiency == 'Learning':
-                    # Bottom 40%
-                    sub_min = min_market
-                    sub_max = int(min_market + (band_span * 0.40))
-                elif proficiency == 'Proficient':
-                    # Middle 40% (Creates overlap)
-                    sub_min = int(min_market + (band_span * 0.30))
-                    sub_max = int(min_market + (band_span * 0.70))
-                else:  # Advanced
-                    # Top 40%
-                    sub_min = int(min_market + (band_span * 0.60))
-                    sub_max = max_market
-
-                salary = random.randint(sub_min, sub_max)
-
-            employee_rows.append({
-                'Name': fake.name(),
-                'Job Title': role,
-                'Job Family': job_family,
-                'Proficiency': proficiency,
-                'Location': location,
-                'Compensation': f"{symbol}{salary:,}"
-            })
-
-df_employees = pd.DataFrame(employee_rows)
-print(f"Generated {len(employee_rows)} employee entries")
+n = NUM_EMPLOYEES_PER_ROLE_LOCATION
+
+# Employees are sampled straight from the Step 1 range arrays: each market row gets
+# n consecutive employees, so every per-employee column is a repeat of a range column
+salaries, proficiency = sample_salaries(np.repeat(range_mins, n), np.repeat(range_maxs, n))
+loc_idx = np.repeat(range_loc_idx, n)
+role_families = [role_info['job_family'] for role_info in ALL_ROLES.values()]
+
+# Names combine pooled first and last names (one Faker call per pool entry, not per employee)
+first_names = np.array([fake.first_name() for _ in range(NAME_POOL_SIZE)], dtype=object)
+last_names = np.array([fake.last_name() for _ in range(NAME_POOL_SIZE)], dtype=object)
+names = (
+    first_names[rng.integers(0, NAME_POOL_SIZE, len(salaries))] + ' ' +
+    last_names[rng.integers(0, NAME_POOL_SIZE, len(salaries))]
+)
+
+# Salary stays an integer with its currency symbol in its own column, so the roster
+# supports numeric analysis; format as f"{symbol}{salary:,}" only for display
+df_employees = pd.DataFrame({
+    'Name': names,
+    'Job Title': np.repeat(range_titles, n),
+    'Job Family': np.repeat(role_families, num_locations * n),
+    'Proficiency': PROFICIENCY_LEVELS[proficiency],
+    'Location': LOC_CODES[loc_idx],
+    'Symbol': SYMBOLS[loc_idx],
+    'Salary': salaries
+}, copy=False)
+for column in ['Job Title', 'Location', 'Job Family', 'Proficiency', 'Symbol']:
+    df_employees[column] = df_employees[column].astype('category')
+print(f"Generated {len(df_employees)} employee entries")
+
+# The market range table is only materialized once all sampling is done
+df_ranges = pd.DataFrame({
+    'Job Title': range_titles,
+    'Location': range_locations,
+    'Currency': range_currencies,
+    'Min': range_mins,
+    'Max': range_maxs,
+    'Compensation Range': range_labels
+}, copy=False)
+# Low-cardinality text columns as categoricals (small integer codes + one copy of each label)
+for column in ['Job Title', 'Location', 'Currency']:
+    df_ranges[column] = df_ranges[column].astype('category')
 
 # --- STEP 3: EXPORT FILES ---
 print("\nSaving files...")
 
-# Excel Versions
-df_ranges.to_excel('CompRanges.xlsx', index=False)
-df_employees.to_excel('EmployeeRoster.xlsx', index=False)
+# Excel Version: one workbook with a sheet per table, so the workbook setup is paid once
+# (xlsxwriter streams rows out instead of building openpyxl cell objects)
+with pd.ExcelWriter('CompensationData.xlsx', engine='xlsxwriter') as writer:
+    df_ranges.to_excel(writer, sheet_name='CompRanges', index=False)
+    df_employees.to_excel(writer, sheet_name='EmployeeRoster', index=False)
+
+# Parquet Versions (columnar, for analysis tooling)
+df_ranges.to_parquet('CompRanges.parquet', index=False)
+df_employees.to_parquet('EmployeeRoster.parquet', index=False)
 
 # CSV Versions
-df_ranges.to_csv('CompRanges.csv', index=False)
-df_employees.to_csv('EmployeeRoster.csv', index=False)
+write_csv(df_ranges, 'CompRanges.csv')
+write_csv(df_employees, 'EmployeeRoster.csv')
 
-# Summary Statistics
+# Summary Statistics (distinct counts for all columns of a table in one nunique pass)
+range_unique = df_ranges[['Job Title', 'Location']].nunique()
+employee_unique = df_employees[['Job Title', 'Job Family', 'Location']].nunique()
 print("\n=== SUMMARY ===")
 print(f"Total Market Range Entries: {len(df_ranges)}")
-print(f"  - Unique Job Titles: {df_ranges['Job Title'].nunique()}")
-print(f"  - Unique Locations: {df_ranges['Location'].nunique()}")
+print(f"  - Unique Job Titles: {range_unique['Job Title']}")
+print(f"  - Unique Locations: {range_unique['Location']}")
 print(f"  - Unique Combinations: {len(df_ranges)}")
 print(f"\nTotal Employee Entries: {len(df_employees)}")
-print(f"  - Unique Job Titles: {df_employees['Job Title'].nunique()}")
-print(f"  - Unique Job Families: {df_employees['Job Family'].nunique()}")
-print(f"  - Unique Locations: {df_employees['Location'].nunique()}")
+print(f"  - Unique Job Titles: {employee_unique['Job Title']}")
+print(f"  - Unique Job Families: {employee_unique['Job Family']}")
+print(f"  - Unique Locations: {employee_unique['Location']}")
 print(f"\nJob Family Distribution:")
-for job_family in sorted(df_employees['Job Family'].unique()):
-    count = len(df_employees[df_employees['Job Family'] == job_family])
+for job_family, count in df_employees['Job Family'].value_counts().sort_index().items():
     print(f"  - {job_family}: {count} employees")
 
 print("\n✅ Success! Created:")
-print("  - CompRanges.xlsx")
+print("  - CompensationData.xlsx")
 print("  - CompRanges.csv")
-print("  - EmployeeRoster.xlsx")
 print("  - EmployeeRoster.csv")
+print("  - CompRanges.parquet")
+print("  - EmployeeRoster.parquet")
 print("\nNote: EmployeeRoster now includes 'Job Family' column!")
 
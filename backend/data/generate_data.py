@@ -1,146 +1,166 @@
+import numpy as np
 import pandas as pd
-import random
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 from faker import Faker
 
-fake = Faker()
+from _config import LOCATIONS, JOB_FAMILIES
 
 # --- CONFIGURATION ---
+SEED = 42  # Seeds every random draw (NumPy and Faker) so reruns produce the same files
 NUM_MARKET_ROWS = 100
 NUM_EMPLOYEES = 8000
 OUTLIER_CHANCE = 0.05  # 5% Low, 5% High
+NAME_POOL_SIZE = 2000  # Distinct first and last names to combine into employee names
+
+# One seeded generator for all sampling
+rng = np.random.default_rng(SEED)
+Faker.seed(SEED)
+fake = Faker()
+
+# Proficiency tiers; employees carry an index into this array until the DataFrame is built
+PROFICIENCY_LEVELS = np.array(['Learning', 'Proficient', 'Advanced'], dtype=object)
+# Proficiency odds for outliers: low outliers lean Learning, high outliers lean Advanced
+LOW_OUTLIER_PROFICIENCY_P = [2 / 3, 1 / 3, 0]
+HIGH_OUTLIER_PROFICIENCY_P = [0, 1 / 3, 2 / 3]
+
+# Location lookup tables indexed by a location's position in LOCATIONS, so per-row
+# location data is an int8 index plus one gather instead of nested dict lookups
+LOC_CODES = np.array(list(LOCATIONS), dtype=object)
+SYMBOLS = np.array([LOCATIONS[code]['symbol'] for code in LOC_CODES], dtype=object)
+
+# Base salary per role, across every job family
+ROLES = {role: base_salary for roles in JOB_FAMILIES.values() for role, base_salary in roles.items()}
+
+
+def sample_salaries(min_market, max_market):
+    """Sample a salary and proficiency index for every employee in one vectorized pass.
+    
+    min_market/max_market hold each employee's market band. OUTLIER_CHANCE of
+    employees land just below Min (SCENARIO A) or above Max (SCENARIO B); the rest
+    (SCENARIO C) are paid within the sub-band matching their proficiency.
+    """
+    count = len(min_market)
+    band_span = max_market - min_market
+    
+    rand_check = rng.random(count)
+    low = rand_check < OUTLIER_CHANCE  # SCENARIO A: LOW OUTLIER (Below Min)
+    high = rand_check > (1 - OUTLIER_CHANCE)  # SCENARIO B: HIGH OUTLIER (Above Max)
+    
+    # Proficiency index into PROFICIENCY_LEVELS; SCENARIO C (standard range) is uniform
+    proficiency = rng.integers(0, 3, count)
+    proficiency[low] = rng.choice(3, low.sum(), p=LOW_OUTLIER_PROFICIENCY_P)
+    proficiency[high] = rng.choice(3, high.sum(), p=HIGH_OUTLIER_PROFICIENCY_P)
+    
+    # Correlate Proficiency to Salary Band position:
+    # Learning bottom 40%, Proficient middle 40% (creates overlap), Advanced top 40%
+    sub_min = np.choose(proficiency, [
+        min_market,
+        (min_market + band_span * 0.30).astype(int),
+        (min_market + band_span * 0.60).astype(int)
+    ])
+    sub_max = np.choose(proficiency, [
+        (min_market + band_span * 0.40).astype(int),
+        (min_market + band_span * 0.70).astype(int),
+        max_market
+    ])
+    # Outliers fall just outside the band instead
+    sub_min = np.where(low, (min_market * 0.90).astype(int), np.where(high, (max_market * 1.01).astype(int), sub_min))
+    sub_max = np.where(low, (min_market * 0.99).astype(int), np.where(high, (max_market * 1.10).astype(int), sub_max))
+    
+    return rng.integers(sub_min, sub_max, endpoint=True), proficiency
+
+
+def write_csv(df, path):
+    """Write df to path as CSV using Arrow's multithreaded C++ writer."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pa_csv.write_csv(table, path, pa_csv.WriteOptions(quoting_style='needed'))
 
-# Locations with Cost of Living Multipliers
-LOCATIONS = {
-    'LAX': {'currency': 'USD', 'symbol': '$', 'multiplier': 1.25},
-    'DUB': {'currency': 'EUR', 'symbol': '€', 'multiplier': 0.90},
-    'STL': {'currency': 'USD', 'symbol': '$', 'multiplier': 0.85},
-    'SHA': {'currency': 'CNY', 'symbol': '¥', 'multiplier': 3.80},
-    'SYD': {'currency': 'AUD', 'symbol': '$', 'multiplier': 1.35},
-    'SIN': {'currency': 'SGD', 'symbol': '$', 'multiplier': 1.45},
-    'SEA': {'currency': 'USD', 'symbol': '$', 'multiplier': 1.30}
-}
-
-# Expanded Roles
-ROLES = {
-    # Engineering & Tech
-    'Software Engineer': 115000, 'Senior Software Engineer': 165000, 'Staff Engineer': 210000,
-    'Data Scientist': 125000, 'Data Analyst': 85000, 'DevOps Engineer': 130000,
-    'UX Designer': 110000, 'UI Designer': 95000, 'Product Manager': 135000,
-    'Project Manager': 105000, 'QA Engineer': 90000, 'System Administrator': 85000,
-    'Network Engineer': 100000, 'Security Analyst': 115000, 'Cloud Architect': 160000,
-    'Frontend Developer': 110000, 'Backend Developer': 115000, 'Mobile Developer': 120000,
-    'Tech Lead': 180000, 'Engineering Manager': 195000, 'Director of Engineering': 230000,
-
-    # Sales & Marketing
-    'Sales Representative': 65000, 'Account Executive': 95000, 'Sales Manager': 140000,
-    'Marketing Manager': 100000, 'Brand Manager': 110000, 'Content Strategist': 85000,
-    'SEO Specialist': 75000, 'Social Media Manager': 70000, 'VP of Sales': 210000,
-    'Customer Success Manager': 80000, 'Customer Support Lead': 65000,
-
-    # HR, Finance & Ops
-    'HR Generalist': 75000, 'Recruiter': 80000, 'HR Business Partner': 110000,
-    'Office Manager': 60000, 'Executive Assistant': 80000, 'Operations Manager': 105000,
-    'Business Analyst': 95000, 'Financial Analyst': 90000, 'Controller': 130000,
-    'Accountant': 75000, 'Legal Counsel': 170000, 'Procurement Specialist': 85000,
-    'Chief of Staff': 180000, 'Operations Coordinator': 55000
-}
 
 # --- STEP 1: GENERATE MARKET RANGES ---
-market_rows = []
-seen_combos = set()
+# Collected column by column, then handed to the DataFrame constructor as arrays
+range_titles, range_loc_idx, range_currencies = [], [], []
+range_mins, range_maxs, range_labels = [], [], []
 print("Generating Market Ranges...")
 
-while len(market_rows) < NUM_MARKET_ROWS:
-    loc_code = random.choice(list(LOCATIONS.keys()))
-    role = random.choice(list(ROLES.keys()))
+# Distinct role-location combos, sampled without replacement (no rerolling duplicates)
+all_combos = [(role, loc) for role in ROLES for loc in range(len(LOC_CODES))]
+picked = rng.choice(len(all_combos), size=NUM_MARKET_ROWS, replace=False)
 
-    combo = f"{role}-{loc_code}"
-    if combo in seen_combos: continue
-    seen_combos.add(combo)
-
-    meta = LOCATIONS[loc_code]
+for role, loc in (all_combos[i] for i in picked):
+    meta = LOCATIONS[LOC_CODES[loc]]
     base = ROLES[role] * meta['multiplier']
 
     # Range is Base +/- 15%
     min_sal = int(base * 0.85 / 1000) * 1000
     max_sal = int(base * 1.15 / 1000) * 1000
 
-    market_rows.append({
-        'Job Title': role,
-        'Location': loc_code,
-        'Currency': meta['currency'],
-        'Min': min_sal,
-        'Max': max_sal,
-        'Compensation Range': f"{meta['symbol']}{min_sal:,} - {meta['symbol']}{max_sal:,}"
-    })
-
-df_ranges = pd.DataFrame(market_rows)
+    range_titles.append(role)
+    range_loc_idx.append(loc)
+    range_currencies.append(meta['currency'])
+    range_mins.append(min_sal)
+    range_maxs.append(max_sal)
+    range_labels.append(f"{meta['symbol']}{min_sal:,} - {meta['symbol']}{max_sal:,}")
+
+df_ranges = pd.DataFrame({
+    'Job Title': range_titles,
+    'Location': LOC_CODES[range_loc_idx],
+    'Currency': range_currencies,
+    'Min': np.array(range_mins, dtype=np.int64),
+    'Max': np.array(range_maxs, dtype=np.int64),
+    'Compensation Range': range_labels
+}, copy=False)
+# Low-cardinality text columns as categoricals (small integer codes + one copy of each label)
+for column in ['Job Title', 'Location', 'Currency']:
+    df_ranges[column] = df_ranges[column].astype('category')
 
 # --- STEP 2: GENERATE EMPLOYEE ROSTER ---
-employee_rows = []
 print("Generating Employee Roster...")
 
-for _ in range(NUM_EMPLOYEES):
-    market_role = random.choice(market_rows)
-    min_market = market_role['Min']
-    max_market = market_role['Max']
-    band_span = max_market - min_market
-
-    rand_check = random.random()
-    salary = 0
-    proficiency = ""
-
-    # -- SCENARIO A: LOW OUTLIER (Below Min) --
-    if rand_check < OUTLIER_CHANCE:
-        salary = random.randint(int(min_market * 0.90), int(min_market * 0.99))
-        proficiency = random.choice(['Learning', 'Learning', 'Proficient'])
-
-    # -- SCENARIO B: HIGH OUTLIER (Above Max) --
-    elif rand_check > (1 - OUTLIER_CHANCE):
-        salary = random.randint(int(max_market * 1.01), int(max_market * 1.10))
-        proficiency = random.choice(['Advanced', 'Advanced', 'Proficient'])
-
-    # -- SCENARIO C: STANDARD RANGE --
-    else:
-        proficiency = random.choice(['Learning', 'Proficient', 'Advanced'])
-
-        # Correlate Proficiency to Salary Band position
-        if proficiency == 'Learning':
-            # Bottom 40%
-            sub_min = min_market
-            sub_max = int(min_market + (band_span * 0.40))
-        elif proficiency == 'Proficient':
-            # Middle 40% (Creates overlap)
-            sub_min = int(min_market + (band_span * 0.30))
-            sub_max = int(min_market + (band_span * 0.70))
-        else:  # Advanced
-            # Top 40%
-            sub_min = int(min_market + (band_span * 0.60))
-            sub_max = max_market
-
-        salary = random.randint(sub_min, sub_max)
-
-    symbol = LOCATIONS[market_role['Location']]['symbol']
-
-    employee_rows.append({
-        'Name': fake.name(),
-        'Job Title': market_role['Job Title'],
-        'Proficiency': proficiency,
-        'Location': market_role['Location'],
-        'Compensation': f"{symbol}{salary:,}"
-    })
-
-df_employees = pd.DataFrame(employee_rows)
-
-# --- STEP 3: EXPORT 4 FILES ---
+# Each employee is placed in a random market row, then all of them are sampled in one pass
+market_idx = rng.integers(0, len(df_ranges), NUM_EMPLOYEES)
+min_market = df_ranges['Min'].to_numpy()[market_idx]
+max_market = df_ranges['Max'].to_numpy()[market_idx]
+loc_idx = np.array(range_loc_idx, dtype=np.int8)[market_idx]
+salaries, proficiency = sample_salaries(min_market, max_market)
+
+# Names combine pooled first and last names (one Faker call per pool entry, not per employee)
+first_names = np.array([fake.first_name() for _ in range(NAME_POOL_SIZE)], dtype=object)
+last_names = np.array([fake.last_name() for _ in range(NAME_POOL_SIZE)], dtype=object)
+names = (
+    first_names[rng.integers(0, NAME_POOL_SIZE, NUM_EMPLOYEES)] + ' ' +
+    last_names[rng.integers(0, NAME_POOL_SIZE, NUM_EMPLOYEES)]
+)
+
+# Salary stays an integer with its currency symbol in its own column, so the roster
+# supports numeric analysis; format as f"{symbol}{salary:,}" only for display
+df_employees = pd.DataFrame({
+    'Name': names,
+    'Job Title': df_ranges['Job Title'].to_numpy()[market_idx],
+    'Proficiency': PROFICIENCY_LEVELS[proficiency],
+    'Location': LOC_CODES[loc_idx],
+    'Symbol': SYMBOLS[loc_idx],
+    'Salary': salaries
+}, copy=False)
+for column in ['Job Title', 'Location', 'Proficiency', 'Symbol']:
+    df_employees[column] = df_employees[column].astype('category')
+
+# --- STEP 3: EXPORT FILES ---
 print("Saving files...")
 
-# Excel Versions
-df_ranges.to_excel('CompRanges.xlsx', index=False)
-df_employees.to_excel('EmployeeRoster.xlsx', index=False)
+# Excel Version: one workbook with a sheet per table, so the workbook setup is paid once
+# (xlsxwriter streams rows out instead of building openpyxl cell objects)
+with pd.ExcelWriter('CompensationData.xlsx', engine='xlsxwriter') as writer:
+    df_ranges.to_excel(writer, sheet_name='CompRanges', index=False)
+    df_employees.to_excel(writer, sheet_name='EmployeeRoster', index=False)
+
+# Parquet Versions (columnar, for analysis tooling)
+df_ranges.to_parquet('CompRanges.parquet', index=False)
+df_employees.to_parquet('EmployeeRoster.parquet', index=False)
 
 # CSV Versions
-df_ranges.to_csv('CompRanges.csv', index=False)
-df_employees.to_csv('EmployeeRoster.csv', index=False)
+write_csv(df_ranges, 'CompRanges.csv')
+write_csv(df_employees, 'EmployeeRoster.csv')
 
-print("Success! Created: CompRanges.xlsx, CompRanges.csv, EmployeeRoster.xlsx, EmployeeRoster.csv")
\ No newline at end of file
+print("Success! Created: CompensationData.xlsx, CompRanges.csv, CompRanges.parquet, "
+      "EmployeeRoster.csv, EmployeeRoster.parquet")
\ No newline at end of file
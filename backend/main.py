@@ -1,13 +1,18 @@
 """FastAPI main application."""
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from sse_starlette.sse import EventSourceResponse
+from fastapi.responses import ORJSONResponse
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
 from typing import Optional
 import asyncio
-import uuid
-import json
+from uuid import uuid4
+import orjson
 import time
+import traceback
+import atexit
+import queue
 import logging
+from logging.handlers import QueueHandler, QueueListener
 
 from models import (
     LoginRequest, LoginResponse, ChatRequest, ContextResetRequest,
@@ -16,21 +21,33 @@ from models import (
 from auth import authenticate_user, create_access_token, get_user_from_token
 from context import context_store, user_context_store
 from utils import system_logger
-from agents import agent_workflow, AgentState
+from config import settings
+from agents import agent_workflow, AgentState, run_in_background, slim_context
 from messages import message_store
 
-# Configure logging to file
+# Configure logging to file. Handlers run on a QueueListener thread, so a log call on the
+# event loop only enqueues the record; the level follows settings.log_level (INFO by
+# default), so logger.debug calls short-circuit in production
+_log_listener = QueueListener(
+    queue.SimpleQueue(),
+    logging.FileHandler('debug.log'),
+    logging.StreamHandler(),  # Also print to console
+    respect_handler_level=True
+)
+for _handler in _log_listener.handlers:
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
 logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('debug.log'),
-        logging.StreamHandler()  # Also print to console
-    ]
+    level=settings.log_level.upper(),
+    handlers=[QueueHandler(_log_listener.queue)]
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Compensation Recommendation Assistant API")
+app = FastAPI(
+    title="Compensation Recommendation Assistant API",
+    default_response_class=ORJSONResponse
+)
 
 # CORS middleware
 app.add_middleware(
@@ -42,6 +59,103 @@ app.add_middleware(
 )
 
 
+def dumps_sse(obj) -> str:
+    """Serialize an SSE event payload with orjson (unknown types via str)."""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def sse_frame(event: str, obj) -> bytes:
+    """Encode a payload as a complete SSE frame, ready to be written to the response."""
+    return ServerSentEvent(dumps_sse(obj), event=event).encode()
+
+
+# Interval for sse-starlette's built-in comment pings; effectively off (see chat_stream)
+SSE_LIBRARY_PING_SECONDS = 24 * 60 * 60
+
+# Recommendation fields copied onto the candidate context after a research run
+RECOMMENDATION_FIELDS = (
+    "base_salary", "base_salary_percentile", "base_salary_percent_of_range",
+    "bonus_percentage", "bonus_amount", "equity_amount", "total_compensation",
+    "market_range", "internal_parity",
+)
+REASONING_FIELDS = (
+    "market_data_analysis", "internal_parity_analysis", "job_family_impact",
+    "proficiency_impact", "level_impact", "band_placement_reasoning",
+    "equity_allocation_reasoning", "bonus_percentage_reasoning",
+    "data_sources_used", "considerations_and_tradeoffs",
+)
+# Candidate fields a workflow run can fill in from the coordinator's updated context
+CONTEXT_FIELDS = ("location", "job_title", "job_level", "proficiency", "interview_feedback", "job_family")
+
+
+# Status shown while each workflow node runs, streamed to the client as the node finishes
+STEP_MESSAGES = {
+    "coordinator": "🔍 Analyzing your message and extracting candidate information...",
+    "data_collection": "📊 Collecting market data and internal parity information...",
+    "research": "🔬 Researching compensation data and generating recommendation...",
+    "judge": "⚖️ Validating recommendation quality...",
+    "respond": "✍️ Finalizing response..."
+}
+# Default status event per node, built and encoded as an SSE frame once at import
+_STATUS_TEMPLATES = {
+    node: {"type": "processing", "step": node, "message": message}
+    for node, message in STEP_MESSAGES.items()
+}
+_STATUS_FRAMES = {node: sse_frame("message", template) for node, template in _STATUS_TEMPLATES.items()}
+
+
+def recommendation_context_data(recommendation: dict) -> dict:
+    """Flatten a research recommendation into the fields saved on the candidate context."""
+    rec = recommendation.get("recommendation", {})
+    if not rec:
+        return {}
+    rec_data = {field: rec.get(field) for field in RECOMMENDATION_FIELDS}
+    reasoning = rec.get("reasoning", {})
+    # Reasoning is either free text or a dict of per-topic explanations
+    if isinstance(reasoning, str) and reasoning:
+        rec_data["reasoning"] = reasoning
+    elif isinstance(reasoning, dict) and reasoning:
+        rec_data.update({field: reasoning.get(field, "") for field in REASONING_FIELDS})
+    return rec_data
+
+
+def turn_context_data(last_state: dict) -> dict:
+    """Collect the candidate fields a workflow run settled on, to be saved on its context.
+    
+    research_data (set once all fields are ready) wins over the coordinator's partial
+    extracted_fields, which win over the rest of its updated context.
+    """
+    context_data = {}
+    research_data = last_state.get("research_data", {})
+    if "job_title" in research_data:
+        context_data["job_title"] = research_data["job_title"]
+    if "location" in research_data:
+        context_data["location"] = research_data["location"]
+    if "level" in research_data:
+        context_data["job_level"] = research_data["level"]
+    if "proficiency" in research_data:
+        context_data["interview_feedback"] = research_data["proficiency"]
+        context_data["proficiency"] = research_data["proficiency"]
+    if "job_family" in research_data:
+        context_data["job_family"] = research_data["job_family"]
+    
+    extracted_fields = last_state.get("extracted_fields", {})
+    if extracted_fields:
+        if "location" in extracted_fields:
+            context_data["location"] = extracted_fields["location"]
+        if "proficiency" in extracted_fields:
+            context_data["proficiency"] = extracted_fields["proficiency"]
+            context_data["interview_feedback"] = extracted_fields.get("interview_feedback", extracted_fields["proficiency"])
+        if "job_level" in extracted_fields:
+            context_data["job_level"] = extracted_fields["job_level"]
+    
+    updated_context = last_state.get("context", {})
+    if updated_context:
+        for key in CONTEXT_FIELDS:
+            if key in updated_context and key not in context_data:
+                context_data[key] = updated_context[key]
+    return context_data
+
 def get_current_user(authorization: str = Header(None)) -> dict:
     """Get current authenticated user from token."""
     if not authorization:
@@ -69,7 +183,7 @@ async def login(login_request: LoginRequest):
     # Get current candidate for user
     current_candidate_id = user_context_store.get_current_candidate(user["email"])
     
-    # Log login
+    # Log login (queued; the system logger writes on its own thread)
     system_logger.log(
         event_type="Login",
         user_email=user["email"],
@@ -88,8 +202,8 @@ async def login(login_request: LoginRequest):
 @app.post("/api/chat/stream")
 async def chat_stream(chat_request: ChatRequest, current_user: dict = Depends(get_current_user)):
     """Stream chat responses using SSE."""
-    session_id = chat_request.session_id or str(uuid.uuid4())
-    request_id = str(uuid.uuid4())
+    session_id = chat_request.session_id or uuid4().hex
+    request_id = uuid4().hex
     user_email = current_user["email"]
     
     # Get current candidate - priority order:
@@ -101,14 +215,14 @@ async def chat_stream(chat_request: ChatRequest, current_user: dict = Depends(ge
         candidate_id = user_context_store.get_current_candidate(user_email)
     if not candidate_id:
         # Look up most recent candidate from message history
-        candidate_id = message_store.get_most_recent_candidate_id(user_email)
+        candidate_id = await asyncio.to_thread(message_store.get_most_recent_candidate_id, user_email)
         if candidate_id:
             # Set as current candidate in user context
             user_context_store.set_current_candidate(user_email, candidate_id)
     
     start_time = time.time()
     
-    # Log user message
+    # Log user message (queued; the system logger writes on its own thread)
     system_logger.log_message(
         user_email=user_email,
         user_type=current_user["user_type"],
@@ -122,26 +236,24 @@ async def chat_stream(chat_request: ChatRequest, current_user: dict = Depends(ge
     # Note: candidate_id might be extracted from message by coordinator agent
     initial_context = {}
     if candidate_id:
-        existing_context = context_store.get_context(candidate_id)
+        existing_context = await asyncio.to_thread(context_store.get_context, candidate_id)
         if existing_context:
             # Only use if candidate is active
             if existing_context.state.value == "active":
-                initial_context = existing_context.model_dump()
+                # Agent-facing fields only; a full model_dump() would also copy history and reasoning
+                initial_context = slim_context(existing_context)
             else:
                 # Candidate is closed, clear from user context
                 user_context_store.clear_current_candidate(user_email)
                 candidate_id = ""
                 initial_context = {}
     
-    # Load message history for candidate (last 10 messages)
-    message_history = []
-    if candidate_id:
-        message_history = message_store.get_messages(candidate_id, limit=10, offset=0)
+    # Message history is not loaded here: the coordinator fetches the user's recent
+    # messages for the resolved candidate itself, concurrently with its context lookup
     
     # Capture variables for closure
     captured_candidate_id = candidate_id
     captured_context = initial_context
-    captured_message_history = message_history
     
     async def event_generator():
         try:
@@ -157,26 +269,25 @@ async def chat_stream(chat_request: ChatRequest, current_user: dict = Depends(ge
                 "updated_by": user_email,  # Pass user email for context saving
                 "user_email": user_email,  # Pass user email for command handling
                 "user_type": current_user["user_type"],
-                "message_history": captured_message_history,  # Pass message history to coordinator
+                "message_history": [],  # Loaded by the coordinator
                 "missing_fields": [],
                 "extracted_fields": {}
             }
             
             # Run agent workflow with keepalive pings using background task
             final_state = None
-            step_messages = {
-                "coordinator": "🔍 Analyzing your message and extracting candidate information...",
-                "data_collection": "📊 Collecting market data and internal parity information...",
-                "research": "🔬 Researching compensation data and generating recommendation...",
-                "judge": "⚖️ Validating recommendation quality...",
-                "respond": "✍️ Finalizing response..."
-            }
             
             # Keepalive mechanism using queue
             ping_interval = 3.0  # seconds
             message_queue = asyncio.Queue()
             workflow_complete = False
             
+            # Queue items are encoded SSE frames; None marks the end of the workflow
+            # Interim progress from inside a node (e.g. streamed Research drafting)
+            initial_state["progress_callback"] = lambda text: message_queue.put_nowait(
+                sse_frame("message", {"type": "processing", "step": "research", "message": text})
+            )
+            
             async def workflow_runner():
                 """Run workflow and put messages in queue."""
                 nonlocal final_state, workflow_complete
@@ -185,20 +296,17 @@ async def chat_stream(chat_request: ChatRequest, current_user: dict = Depends(ge
                         final_state = step_output
                         
                         # Stream intermediate updates with descriptive messages
-                        node_name = list(step_output.keys())[0] if isinstance(step_output, dict) else "unknown"
-                        status_message = step_messages.get(node_name, f"Processing {node_name}...")
+                        # Each update maps the node that just ran to its output; peek without copying
+                        node_name = next(iter(step_output), "unknown") if isinstance(step_output, dict) else "unknown"
                         
                         # Get state from step output to provide more context
                         step_state = None
-                        if isinstance(step_output, dict) and len(step_output) > 0:
-                            step_state = list(step_output.values())[0]
+                        if isinstance(step_output, dict) and step_output:
+                            step_state = step_output[node_name]
                         
-                        # Extract additional context for status updates
-                        status_data = {
-                            "type": "processing",
-                            "step": node_name,
-                            "message": status_message
-                        }
+                        # Details a step adds to its default status (status text, extracted candidate)
+                        status_message = None
+                        status_extra = {}
                         
                         # Add specific details based on step
                         if step_state and isinstance(step_state, dict):
@@ -206,68 +314,78 @@ async def chat_stream(chat_request: ChatRequest, current_user: dict = Depends(ge
                                 # Show if candidate was extracted
                                 extracted_id = step_state.get("candidate_id")
                                 if extracted_id:
-                                    status_data["candidate_id"] = extracted_id
-                                    status_data["message"] = f"✅ Extracted candidate ID: {extracted_id}. Analyzing requirements..."
+                                    status_extra["candidate_id"] = extracted_id
+                                    status_message = f"✅ Extracted candidate ID: {extracted_id}. Analyzing requirements..."
                                 # Check if triggering research
                                 next_step = step_state.get("next_step")
                                 if next_step == "research":
-                                    status_data["message"] = "✅ All information collected. Initiating research..."
+                                    status_message = "✅ All information collected. Initiating research..."
                             elif node_name == "data_collection":
                                 research_data = step_state.get("research_data", {})
                                 market_data = research_data.get("market_data", {})
-                                internal_parity = research_data.get("internal_parity", {})
                                 if market_data.get("available"):
-                                    status_data["message"] = "✅ Market data collected. Gathering internal parity data..."
+                                    status_message = "✅ Market data collected. Gathering internal parity data..."
                                 else:
-                                    status_data["message"] = "⚠️ Market data not found. Checking alternatives..."
+                                    status_message = "⚠️ Market data not found. Checking alternatives..."
                             elif node_name == "research":
-                                research_data = step_state.get("research_data", {})
                                 recommendation = step_state.get("recommendation", {})
                                 if recommendation:
-                                    status_data["message"] = "✅ Recommendation generated. Reviewing details..."
+                                    status_message = "✅ Recommendation generated. Reviewing details..."
                                 else:
-                                    status_data["message"] = "🔬 Analyzing market data and generating compensation recommendation..."
+                                    status_message = "🔬 Analyzing market data and generating compensation recommendation..."
                             elif node_name == "judge":
                                 recommendation = step_state.get("recommendation", {})
                                 if recommendation.get("status") == "approved":
-                                    status_data["message"] = "✅ Recommendation validated. Preparing final response..."
+                                    status_message = "✅ Recommendation validated. Preparing final response..."
                                 else:
-                                    status_data["message"] = "⚖️ Validating recommendation quality and data accuracy..."
+                                    status_message = "⚖️ Validating recommendation quality and data accuracy..."
+                        
+                        # Unchanged statuses reuse their prebuilt frame; the template is
+                        # only copied and encoded when a step above adds details
+                        status_frame = _STATUS_FRAMES.get(node_name)
+                        if status_frame is None or status_message or status_extra:
+                            status_data = dict(_STATUS_TEMPLATES.get(node_name) or {
+                                "type": "processing",
+                                "step": node_name,
+                                "message": f"Processing {node_name}..."
+                            })
+                            if status_message:
+                                status_data["message"] = status_message
+                            status_data.update(status_extra)
+                            status_frame = sse_frame("message", status_data)
                         
                         # Put message in queue
-                        await message_queue.put(("message", status_data))
+                        await message_queue.put(status_frame)
                 finally:
                     workflow_complete = True
-                    await message_queue.put(("complete", None))
+                    await message_queue.put(None)
             
             async def ping_sender():
                 """Send periodic keepalive pings."""
                 while not workflow_complete:
                     await asyncio.sleep(ping_interval)
                     if not workflow_complete:
-                        await message_queue.put(("ping", {"type": "keepalive", "timestamp": time.time()}))
+                        await message_queue.put(sse_frame("ping", {"type": "keepalive", "timestamp": time.time()}))
             
             # Start both tasks
             workflow_task = asyncio.create_task(workflow_runner())
             ping_task = asyncio.create_task(ping_sender())
             
-            # Yield messages from queue
+            # Yield messages from queue. Events that queued up while the previous write was
+            # in flight (e.g. back-to-back workflow steps) are joined into a single chunk,
+            # so they cost one ASGI send instead of one each; nothing waits to be batched
             try:
-                while True:
-                    msg_type, data = await message_queue.get()
+                complete = False
+                while not complete:
+                    batch = [await message_queue.get()]
+                    while not message_queue.empty():
+                        batch.append(message_queue.get_nowait())
                     
-                    if msg_type == "complete":
-                        break
-                    elif msg_type == "ping":
-                        yield {
-                            "event": "ping",
-                            "data": json.dumps(data)
-                        }
-                    elif msg_type == "message":
-                        yield {
-                            "event": "message",
-                            "data": json.dumps(data)
-                        }
+                    if None in batch:
+                        complete = True
+                        del batch[batch.index(None):]
+                    if batch:
+                        yield b"".join(batch)
             finally:
                 # Cancel ping task if still running
                 if not ping_task.done():
@@ -278,8 +396,8 @@ async def chat_stream(chat_request: ChatRequest, current_user: dict = Depends(ge
             # Get final response
             if final_state:
                 # Extract state from final output
-                if isinstance(final_state, dict) and len(final_state) > 0:
-                    last_node_output = list(final_state.values())[0]
+                if isinstance(final_state, dict) and final_state:
+                    last_node_output = next(iter(final_state.values()))
                     if isinstance(last_node_output, dict):
                         last_state = last_node_output
                     else:
@@ -287,78 +405,56 @@ async def chat_stream(chat_request: ChatRequest, current_user: dict = Depends(ge
                 else:
                     last_state = final_state if isinstance(final_state, dict) else {}
                 
+                # Research saves the recommendation in the background; let it land before reading context back
+                persist_task = last_state.get("persist_task")
+                if persist_task:
+                    await persist_task
+                
                 # Extract response from state
                 coordinator_response = last_state.get("response", "I'm sorry, I couldn't process your request.")
-                recommendation = last_state.get("recommendation", {})
+                # Read once and reused below; anything but a dict counts as no recommendation
+                recommendation = last_state.get("recommendation") or {}
+                if not isinstance(recommendation, dict):
+                    recommendation = {}
                 
                 # Debug logging
-                logger.debug(f"coordinator_response = {coordinator_response[:200] if coordinator_response else 'None'}")
-                logger.debug(f"recommendation keys = {recommendation.keys() if isinstance(recommendation, dict) else 'Not a dict'}")
-                logger.debug(f"next_step = {last_state.get('next_step')}")
+                logger.debug("coordinator_response = %.200s", coordinator_response)
+                logger.debug("recommendation keys = %s", recommendation.keys())
+                logger.debug("next_step = %s", last_state.get("next_step"))
                 
                 # Use coordinator response directly - coordinator is responsible for all messaging
                 response_text = coordinator_response
-                logger.debug(f"Using coordinator response directly: {response_text[:200] if response_text else 'None'}")
+                logger.debug("Using coordinator response directly: %.200s", response_text)
                 
                 # Get candidate_id from state (may have been extracted by coordinator)
                 final_candidate_id = last_state.get("candidate_id") or candidate_id
                 
                 # Initialize context variable - will be updated below if candidate exists
                 context = {}
+                # The workflow (and its awaited persist_task) has written everything it will,
+                # so the candidate's context is read once here and reused for the history below
+                final_context = None
                 
+                if final_candidate_id and final_candidate_id == candidate_id and not persist_task:
+                    # Same candidate that was validated as active above and no recommendation was
+                    # persisted, so there is nothing new to read back; the coordinator has already
+                    # made it the user's current candidate
+                    context = last_state.get("context") or captured_context
                 # Update user's current candidate if a new one was extracted and is active
-                if final_candidate_id:
-                    existing_context = context_store.get_context(final_candidate_id)
-                    if existing_context and existing_context.state.value == "active":
+                elif final_candidate_id:
+                    final_context = await asyncio.to_thread(context_store.get_context, final_candidate_id)
+                    if final_context and final_context.state.value == "active":
                         user_context_store.set_current_candidate(user_email, final_candidate_id)
-                        # Reload context
-                        context = existing_context.model_dump()
-                    elif existing_context and existing_context.state.value == "closed":
+                        # Reload context (agent-facing fields, logged as the response's snapshot)
+                        context = slim_context(final_context)
+                    elif final_context and final_context.state.value == "closed":
                         # Candidate is closed, don't set as current
                         final_candidate_id = ""
                         user_context_store.clear_current_candidate(user_email)
                         context = {}
                 
                 # Update context if candidate_id available (either provided or extracted)
-                if final_candidate_id:
-                    
-                    # Extract structured data from response/state
-                    # First, try to get from research_data (when all fields are ready)
-                    research_data = last_state.get("research_data", {})
-                    context_data = {}
-                    if "job_title" in research_data:
-                        context_data["job_title"] = research_data["job_title"]
-                    if "location" in research_data:
-                        context_data["location"] = research_data["location"]
-                    if "level" in research_data:
-                        context_data["job_level"] = research_data["level"]
-                    if "proficiency" in research_data:
-                        context_data["interview_feedback"] = research_data["proficiency"]
-                        context_data["proficiency"] = research_data["proficiency"]
-                    if "job_family" in research_data:
-                        context_data["job_family"] = research_data["job_family"]
-                    
-                    # Also check for extracted_fields from coordinator (partial extraction)
-                    extracted_fields = last_state.get("extracted_fields", {})
-                    if extracted_fields:
-                        if "location" in extracted_fields:
-                            context_data["location"] = extracted_fields["location"]
-                        if "proficiency" in extracted_fields:
-                            context_data["proficiency"] = extracted_fields["proficiency"]
-                            context_data["interview_feedback"] = extracted_fields.get("interview_feedback", extracted_fields["proficiency"])
-                        if "job_level" in extracted_fields:
-                            context_data["job_level"] = extracted_fields["job_level"]
-                    
-                    # Also use updated context from coordinator if available
-                    updated_context = last_state.get("context", {})
-                    if updated_context:
-                        # Merge updated context, prioritizing research_data and extracted_fields
-                        for key in ["location", "job_title", "job_level", "proficiency", "interview_feedback", "job_family"]:
-                            if key in updated_context and key not in context_data:
-                                context_data[key] = updated_context[key]
-                    
-                    if context_data:
-                        context_store.save_context(final_candidate_id, context_data, current_user["email"])
+                context_data = turn_context_data(last_state) if final_candidate_id else {}
                 
                 # Stream final response
                 # ALWAYS include candidate_id if we have one, to ensure UI stays in sync
@@ -366,108 +462,85 @@ async def chat_stream(chat_request: ChatRequest, current_user: dict = Depends(ge
 
                 
                 # Store recommendation in context (for future features like PDF generation)
-                recommendation = last_state.get("recommendation", {})
+                rec_data = {}
                 if recommendation and final_candidate_id:
-                    # Save recommendation data to context
-                    rec_data = {}
-                    if isinstance(recommendation, dict):
-                        rec = recommendation.get("recommendation", {})
-                        if rec:
-                            rec_data = {
-                                "base_salary": rec.get("base_salary"),
-                                "base_salary_percentile": rec.get("base_salary_percentile"),
-                                "base_salary_percent_of_range": rec.get("base_salary_percent_of_range"),
-                                "bonus_percentage": rec.get("bonus_percentage"),
-                                "bonus_amount": rec.get("bonus_amount"),
-                                "equity_amount": rec.get("equity_amount"),
-                                "total_compensation": rec.get("total_compensation"),
-                                "market_range": rec.get("market_range"),
-                                "internal_parity": rec.get("internal_parity"),
-                            }
-                            reasoning = rec.get("reasoning", {})
-                            if reasoning:
-                                # Handle reasoning being a string or dict
-                                if isinstance(reasoning, str):
-                                    rec_data["reasoning"] = reasoning
-                                elif isinstance(reasoning, dict):
-                                    rec_data.update({
-                                        "market_data_analysis": reasoning.get("market_data_analysis", ""),
-                                        "internal_parity_analysis": reasoning.get("internal_parity_analysis", ""),
-                                        "job_family_impact": reasoning.get("job_family_impact", ""),
-                                        "proficiency_impact": reasoning.get("proficiency_impact", ""),
-                                        "level_impact": reasoning.get("level_impact", ""),
-                                        "band_placement_reasoning": reasoning.get("band_placement_reasoning", ""),
-                                        "equity_allocation_reasoning": reasoning.get("equity_allocation_reasoning", ""),
-                                        "bonus_percentage_reasoning": reasoning.get("bonus_percentage_reasoning", ""),
-                                        "data_sources_used": reasoning.get("data_sources_used", ""),
-                                        "considerations_and_tradeoffs": reasoning.get("considerations_and_tradeoffs", ""),
-                                    })
-                        if rec_data:
-                            context_store.save_context(final_candidate_id, rec_data, current_user["email"])
+                    # Recommendation data to save to context (written by save_turn_context below)
+                    rec_data = recommendation_context_data(recommendation)
                 
                 # Include recommendation data for detailed explanation in sidebar
                 recommendation_for_response = None
-                if recommendation and isinstance(recommendation, dict) and recommendation.get("status") == "approved":
+                if recommendation.get("status") == "approved":
                     recommendation_for_response = recommendation
                     
                     # Inject history from candidate context
                     if final_candidate_id:
-                         ctx = context_store.get_context(final_candidate_id)
+                         ctx = final_context
                          if ctx and ctx.recommendation_history:
                              # Sort history by timestamp desc (newest first)
                              history_sorted = sorted(ctx.recommendation_history, key=lambda h: h.timestamp, reverse=True)
                              recommendation_for_response["history"] = [h.model_dump() for h in history_sorted]
                 
+                def save_turn_context():
+                    """Save this turn's context and recommendation updates."""
+                    if context_data:
+                        context_store.save_context(final_candidate_id, context_data, current_user["email"])
+                    if rec_data:
+                        context_store.save_context(final_candidate_id, rec_data, current_user["email"])
+                
+                # The client reloads its candidate lists as soon as the response arrives,
+                # so the context saves land before the final event
+                if context_data or rec_data:
+                    await asyncio.to_thread(save_turn_context)
+                
                 # Stream the response from coordinator (coordinator is responsible for all messaging)
-                print(f"DEBUG: Streaming final response. Candidate: {response_candidate_id}, Has recommendation: {recommendation_for_response is not None}")
-                yield {
-                    "event": "message",
-                    "data": json.dumps({
-                        "type": "response",
-                        "content": response_text,
-                        "response_id": request_id,
-                        "candidate_id": response_candidate_id,  # Only include if active
-                        "recommendation": recommendation_for_response  # Include for sidebar display
-                    })
-                }
+                logger.debug("Streaming final response. Candidate: %s, Has recommendation: %s",
+                             response_candidate_id, recommendation_for_response is not None)
+                yield sse_frame("message", {
+                    "type": "response",
+                    "content": response_text,
+                    "response_id": request_id,
+                    "candidate_id": response_candidate_id,  # Only include if active
+                    "recommendation": recommendation_for_response  # Include for sidebar display
+                })
 
                 
-                # Save message to message store (always save - messages are per user)
-                print(f"DEBUG: Attempting to save message for user={user_email}, candidate={final_candidate_id}")
-                try:
-                    print(f"DEBUG: Saving message. Response length: {len(response_text) if response_text else 0}")
-                    message_store.save_message(
-                        user_email=user_email,
-                        message=chat_request.message,
+                def persist_turn():
+                    """Save the exchange, then log the response."""
+                    # Save message to message store (always save - messages are per user)
+                    logger.debug("Attempting to save message for user=%s, candidate=%s", user_email, final_candidate_id)
+                    try:
+                        logger.debug("Saving message. Response length: %d", len(response_text) if response_text else 0)
+                        message_store.save_message(
+                            user_email=user_email,
+                            message=chat_request.message,
+                            response=response_text,
+                            session_id=session_id,
+                            request_id=request_id,
+                            candidate_id=final_candidate_id  # Optional - can be None
+                        )
+                        logger.debug("Message saved successfully")
+                    except Exception:
+                        logger.exception("Error saving message")
+                    
+                    # Log response
+                    response_time = (time.time() - start_time) * 1000  # Convert to ms
+                    system_logger.log_response(
+                        user_email=current_user["email"],
+                        user_type=current_user["user_type"],
                         response=response_text,
+                        candidate_id=final_candidate_id,  # Use final candidate_id
                         session_id=session_id,
                         request_id=request_id,
-                        candidate_id=final_candidate_id  # Optional - can be None
+                        response_time_ms=response_time,
+                        context_snapshot=context
                     )
-                    print(f"DEBUG: Message saved successfully")
-                except Exception as e:
-                    print(f"Error saving message: {e}")
-                    import traceback
-                    traceback.print_exc()
                 
-                # Log response
-                response_time = (time.time() - start_time) * 1000  # Convert to ms
-                system_logger.log_response(
-                    user_email=current_user["email"],
-                    user_type=current_user["user_type"],
-                    response=response_text,
-                    candidate_id=final_candidate_id,  # Use final candidate_id
-                    session_id=session_id,
-                    request_id=request_id,
-                    response_time_ms=response_time,
-                    context_snapshot=context
-                )
+                # The message and log writes run after the final event so the stream closes without waiting on them
+                run_in_background(persist_turn)
         except Exception as e:
-            import traceback
             error_msg = f"Error processing request: {str(e)}"
             error_traceback = traceback.format_exc()
-            print(f"Error in chat stream: {error_msg}")
-            print(f"Traceback: {error_traceback}")
+            logger.exception("Error in chat stream")
             system_logger.log(
                 event_type="Error",
                 user_email=current_user["email"],
@@ -477,12 +550,11 @@ async def chat_stream(chat_request: ChatRequest, current_user: dict = Depends(ge
                 status="Error",
                 error_message=error_msg
             )
-            yield {
-                "event": "error",
-                "data": json.dumps({"error": error_msg, "details": error_traceback[:500]})
-            }
+            yield sse_frame("error", {"error": error_msg, "details": error_traceback[:500]})
     
-    return EventSourceResponse(event_generator())
+    # event_generator sends its own keepalive events every few seconds, so the library's
+    # comment pings are pushed out past any realistic stream lifetime
+    return EventSourceResponse(event_generator(), ping=SSE_LIBRARY_PING_SECONDS)
 
 
 @app.post("/api/context/reset")
@@ -545,14 +617,14 @@ async def get_messages(
     messages = message_store.get_messages(user_email, limit=limit, offset=offset, candidate_id=candidate_id)
     total = message_store.get_message_count(user_email, candidate_id=candidate_id)
     
-    return {
+    return ORJSONResponse({
         "user_email": user_email,
         "candidate_id": candidate_id,
         "messages": messages,
         "total": total,
         "limit": limit,
         "offset": offset
-    }
+    })
 
 
 @app.get("/api/messages/all")
@@ -564,11 +636,11 @@ async def get_all_messages(
     user_email = current_user["email"]
     messages = message_store.get_all_messages(user_email, limit=limit)
     
-    return {
+    return ORJSONResponse({
         "user_email": user_email,
         "messages": messages,
         "total": len(messages)
-    }
+    })
 
 
 @app.get("/api/user/current-candidate")
@@ -603,9 +675,11 @@ async def get_user_candidates(
     else:
         candidates = context_store.get_active_candidates(current_user["email"])
     
-    return {
+    # Returned as a response object so FastAPI hands the dumps straight to orjson
+    # instead of re-walking every field with jsonable_encoder
+    return ORJSONResponse({
         "candidates": [c.model_dump() for c in candidates]
-    }
+    })
 
 
 @app.get("/api/logs")
@@ -626,7 +700,7 @@ async def get_logs(
 @app.post("/api/feedback", response_model=FeedbackResponse)
 async def submit_feedback(feedback_request: FeedbackRequest, current_user: dict = Depends(get_current_user)):
     """Submit user feedback on a response."""
-    feedback_id = str(uuid.uuid4())
+    feedback_id = uuid4().hex
     
     # Log feedback
     system_logger.log_feedback(
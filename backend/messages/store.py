@@ -1,11 +1,56 @@
 """Message storage for conversation history - stored per USER, not per candidate."""
-import json
 import os
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 from models import Message
 from config import DATA_DIR
+from utils.file_io import append_jsonl, atomic_write_jsonl, read_json, read_jsonl, read_jsonl_tail
+
+
+# Characters of an email that can't appear in its message file name, mapped in one pass
+_EMAIL_FILENAME_TABLE = str.maketrans({"@": "_at_", ".": "_", "/": "_"})
+
+
+@lru_cache(maxsize=1024)
+def safe_email(user_email: str) -> str:
+    """Sanitize user_email for use in a filename."""
+    return user_email.translate(_EMAIL_FILENAME_TABLE)
+
+
+@dataclass(slots=True)
+class UserHistory:
+    """A user's parsed messages (oldest first) plus lookups derived from them.
+    
+    Only ever grows through add(), so readers can use it without holding the lock.
+    """
+    # File (mtime_ns, size) the messages were read at; None when not cacheable
+    signature: Optional[Tuple[int, int]]
+    messages: List[dict] = field(default_factory=list)
+    # Positions in messages of each candidate's messages, oldest first
+    by_candidate: Dict[str, List[int]] = field(default_factory=dict)
+    last_candidate_id: Optional[str] = None
+    
+    @classmethod
+    def build(cls, signature: Optional[Tuple[int, int]], messages: List[dict]) -> "UserHistory":
+        # Takes ownership of the decoded list rather than copying it message by message
+        history = cls(signature, messages)
+        for position, message in enumerate(messages):
+            history._index(position, message)
+        return history
+    
+    def add(self, message: dict) -> None:
+        self.messages.append(message)
+        self._index(len(self.messages) - 1, message)
+    
+    def _index(self, position: int, message: dict) -> None:
+        candidate_id = message.get("candidate_id")
+        if candidate_id:
+            self.by_candidate.setdefault(candidate_id, []).append(position)
+            self.last_candidate_id = candidate_id
 
 
 class MessageStore:
@@ -20,12 +65,52 @@ class MessageStore:
         self.data_dir = data_dir or DATA_DIR
         self.messages_dir = self.data_dir / "messages"
         self.messages_dir.mkdir(parents=True, exist_ok=True)
+        # Parsed history per user, valid while the file still has the signature it was read at
+        self._cache: Dict[str, UserHistory] = {}
+        self._lock = threading.Lock()
+    
+    def _load(self, user_email: str) -> UserHistory:
+        """Return a user's history, parsing the file only when it changed."""
+        with self._lock:
+            return self._load_locked(user_email)
+    
+    def _cached(self, user_email: str) -> Optional[UserHistory]:
+        """Return the user's cached history if it still matches the file, else None."""
+        cached = self._cache.get(user_email)
+        if cached is None:
+            return None
+        try:
+            st = self._get_message_file(user_email).stat()
+        except FileNotFoundError:
+            return None
+        return cached if cached.signature == (st.st_mtime_ns, st.st_size) else None
+    
+    def _load_locked(self, user_email: str) -> UserHistory:
+        """_load for callers already holding the lock."""
+        message_file = self._get_message_file(user_email)
+        try:
+            st = message_file.stat()
+        except FileNotFoundError:
+            # Not migrated yet: fall back to the user's JSON-array history, if any
+            # ("[]" and smaller hold no messages, so they aren't parsed)
+            legacy_file = message_file.with_suffix(".json")
+            try:
+                has_legacy = legacy_file.stat().st_size > 2
+            except FileNotFoundError:
+                has_legacy = False
+            return UserHistory.build(None, read_json(legacy_file) if has_legacy else [])
+        signature = (st.st_mtime_ns, st.st_size)
+        cached = self._cache.get(user_email)
+        if cached and cached.signature == signature:
+            return cached
+        # An empty file has no messages; skip opening and parsing it
+        history = UserHistory.build(signature, read_jsonl(message_file) if st.st_size else [])
+        self._cache[user_email] = history
+        return history
     
     def _get_message_file(self, user_email: str) -> Path:
-        """Get the message file path for a user."""
-        # Sanitize user_email for filename
-        safe_email = user_email.replace("@", "_at_").replace(".", "_").replace("/", "_")
-        return self.messages_dir / f"user_{safe_email}.json"
+        """Get the message file path for a user (JSON Lines, one message per line)."""
+        return self.messages_dir / f"user_{safe_email(user_email)}.jsonl"
     
     def save_message(
         self,
@@ -45,15 +130,6 @@ class MessageStore:
         
         message_file = self._get_message_file(user_email)
         
-        # Load existing messages
-        messages = []
-        if message_file.exists():
-            try:
-                with open(message_file, 'r', encoding='utf-8') as f:
-                    messages = json.load(f)
-            except Exception:
-                messages = []
-        
         # Create new message entry
         new_message = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -65,15 +141,32 @@ class MessageStore:
             "candidate_id": candidate_id  # Optional - can be None for greetings
         }
         
-        # Append to messages (newest last)
-        messages.append(new_message)
-        
-        # Save back to file
-        try:
-            with open(message_file, 'w', encoding='utf-8') as f:
-                json.dump(messages, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error saving message: {e}")
+        with self._lock:
+            # Bring the cached history up to date before appending to it
+            try:
+                history = self._load_locked(user_email)
+            except Exception:
+                history = None
+            
+            # Append to messages (newest last) - one line, not a rewrite of the whole history
+            try:
+                if message_file.exists():
+                    append_jsonl(message_file, new_message)
+                else:
+                    # First save for this user: carry over any JSON-array history
+                    atomic_write_jsonl(message_file, (history.messages if history else []) + [new_message])
+            except Exception as e:
+                print(f"Error saving message: {e}")
+                self._cache.pop(user_email, None)
+                return
+            
+            if history is None:
+                self._cache.pop(user_email, None)
+            else:
+                history.add(new_message)
+                st = message_file.stat()
+                history.signature = (st.st_mtime_ns, st.st_size)
+                self._cache[user_email] = history
     
     def get_messages(
         self,
@@ -90,28 +183,21 @@ class MessageStore:
         if not user_email:
             return []
         
-        message_file = self._get_message_file(user_email)
-        
-        if not message_file.exists():
-            return []
-        
         try:
-            with open(message_file, 'r', encoding='utf-8') as f:
-                messages = json.load(f)
+            history = self._load(user_email)
+            messages = history.messages
             
-            # Filter by candidate_id if provided
+            # Filter by candidate_id if provided: page through the candidate's positions
             if candidate_id:
-                messages = [m for m in messages if m.get("candidate_id") == candidate_id]
-            
-            # Reverse to get newest first
-            messages_reversed = list(reversed(messages))
-            
-            # Apply pagination
-            start = offset
-            end = offset + limit
-            paginated = messages_reversed[start:end]
+                positions = history.by_candidate.get(candidate_id, [])
+                end = max(0, len(positions) - offset)
+                start = max(0, end - limit)
+                return [messages[i] for i in reversed(positions[start:end])]
             
-            return paginated
+            # Slice the page off the tail, then reverse it to get newest first
+            end = max(0, len(messages) - offset)
+            start = max(0, end - limit)
+            return messages[start:end][::-1]
         except Exception as e:
             print(f"Error loading messages: {e}")
             return []
@@ -121,17 +207,17 @@ class MessageStore:
         if not user_email:
             return []
         
-        message_file = self._get_message_file(user_email)
-        
-        if not message_file.exists():
-            return []
-        
         try:
-            with open(message_file, 'r', encoding='utf-8') as f:
-                messages = json.load(f)
+            # Nothing parsed for this user yet: decode just the tail of the file rather
+            # than the whole history (without populating the cache)
+            message_file = self._get_message_file(user_email)
+            if limit > 0 and self._cached(user_email) is None and message_file.exists():
+                return read_jsonl_tail(message_file, limit)
+            
+            messages = self._load(user_email).messages
             
             # Return most recent messages (oldest first for display)
-            return messages[-limit:] if len(messages) > limit else messages
+            return messages[-limit:]
         except Exception as e:
             print(f"Error loading messages: {e}")
             return []
@@ -141,19 +227,13 @@ class MessageStore:
         if not user_email:
             return 0
         
-        message_file = self._get_message_file(user_email)
-        
-        if not message_file.exists():
-            return 0
-        
         try:
-            with open(message_file, 'r', encoding='utf-8') as f:
-                messages = json.load(f)
+            history = self._load(user_email)
             
             if candidate_id:
-                messages = [m for m in messages if m.get("candidate_id") == candidate_id]
+                return len(history.by_candidate.get(candidate_id, ()))
             
-            return len(messages)
+            return len(history.messages)
         except Exception:
             return 0
     
@@ -162,21 +242,8 @@ class MessageStore:
         if not user_email:
             return None
         
-        message_file = self._get_message_file(user_email)
-        
-        if not message_file.exists():
-            return None
-        
         try:
-            with open(message_file, 'r', encoding='utf-8') as f:
-                messages = json.load(f)
-            
-            # Search from newest to oldest for a message with candidate_id
-            for msg in reversed(messages):
-                if msg.get("candidate_id"):
-                    return msg["candidate_id"]
-            
-            return None
+            return self._load(user_email).last_candidate_id
         except Exception:
             return None
 
@@ -1,5 +1,12 @@
 """Utility modules."""
 from .system_logger import system_logger
+from .file_io import (
+    append_jsonl, atomic_write_bytes, atomic_write_json, atomic_write_jsonl, dumps_json,
+    read_json, read_jsonl, read_jsonl_tail, warm_page_cache,
+)
 
-__all__ = ["system_logger"]
+__all__ = [
+    "system_logger", "append_jsonl", "atomic_write_bytes", "atomic_write_json", "atomic_write_jsonl",
+    "dumps_json", "read_json", "read_jsonl", "read_jsonl_tail", "warm_page_cache",
+]
 
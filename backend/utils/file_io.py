@@ -0,0 +1,136 @@
+"""File I/O helpers shared by the JSON stores."""
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+import orjson
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Encode obj as compact JSON bytes (orjson; datetimes natively, other unknown types via str)."""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def read_json(path: Path) -> Any:
+    """Read and decode a whole JSON file in one go.
+    
+    The file is memory-mapped and parsed straight from the mapping, so large
+    store files aren't first copied into a bytes object.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return orjson.loads(b"")  # Raises, same as any other unparseable file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)  # Parsed front to back: read ahead aggressively
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def read_jsonl(path: Path) -> list:
+    """Read a JSON Lines file into a list, one decoded value per non-empty line.
+    
+    Like read_json, the file is memory-mapped and each line is parsed straight from
+    the mapping, so neither the file nor its lines are copied into bytes objects.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            records = []
+            with memoryview(mm) as view:
+                start, size = 0, len(mm)
+                while start < size:
+                    end = mm.find(b"\n", start)
+                    if end == -1:
+                        end = size
+                    if end > start:
+                        with view[start:end] as line:
+                            records.append(orjson.loads(line))
+                    start = end + 1
+            return records
+
+
+def read_jsonl_tail(path: Path, count: int) -> list:
+    """Decode only the last count non-empty lines of a JSON Lines file, oldest first.
+    
+    Line breaks are found by scanning back from the end of the memory-mapped file,
+    so the work depends on count, not on the file size.
+    """
+    with open(path, 'rb') as f:
+        if count <= 0 or os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            records = []
+            with memoryview(mm) as view:
+                end = len(mm)
+                while end > 0 and len(records) < count:
+                    start = mm.rfind(b"\n", 0, end) + 1
+                    if end > start:
+                        with view[start:end] as line:
+                            records.append(orjson.loads(line))
+                    end = start - 1
+            records.reverse()
+            return records
+
+
+def append_jsonl(path: Path, obj: Any) -> None:
+    """Append obj to a JSON Lines file as one line, in a single write."""
+    with open(path, 'ab') as f:
+        f.write(dumps_json(obj) + b"\n")
+
+
+def atomic_write_jsonl(path: Path, objs: list) -> None:
+    """Atomically write objs to path as JSON Lines."""
+    atomic_write_bytes(path, b"".join(dumps_json(obj) + b"\n" for obj in objs))
+
+
+def warm_page_cache(*paths: Path) -> None:
+    """Ask the kernel to start reading files into the page cache.
+    
+    Uses posix_fadvise(WILLNEED), which returns immediately and lets readahead run
+    in the background, so a later load finds the pages already resident. Missing
+    files and platforms without posix_fadvise are silently skipped.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data to path without ever leaving a partial file.
+    
+    The data goes to a uniquely named temp file in the same directory (so concurrent
+    writers never share one), is fsynced, and is then moved over the target with
+    os.replace, so readers (and a restart after a crash) see either the old or the
+    new contents.
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + '.', suffix='.tmp', delete=False) as f:
+        tmp = f.name
+        try:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.unlink(tmp)
+            raise
+    os.replace(tmp, path)
+
+
+def atomic_write_json(path: Path, obj: Any) -> None:
+    """Atomically write obj to path as compact JSON."""
+    atomic_write_bytes(path, dumps_json(obj))
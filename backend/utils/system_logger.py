@@ -1,10 +1,29 @@
 """System logging utility."""
+import atexit
 import csv
 import os
+import queue
+import threading
+import time
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from config import LOG_DIR, LOG_FILE
+from utils.file_io import dumps_json
+
+
+# Most rows a flush writes before flushing the file
+FLUSH_MAX_ROWS = 256
+
+
+def json_cell(value: Any) -> str:
+    """Render a structured log value as a JSON CSV cell (strings pass through as is)."""
+    if isinstance(value, str):
+        return value
+    try:
+        return dumps_json(value).decode()
+    except TypeError:
+        return str(value)
 
 
 class SystemLogger:
@@ -13,44 +32,85 @@ class SystemLogger:
     def __init__(self, log_file: Path = None):
         self.log_file = log_file or LOG_FILE
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        # One long-lived buffered handle instead of an open/close per event
+        self._file = open(self.log_file, 'a', newline='', encoding='utf-8', buffering=65536)
+        self._writer = csv.writer(self._file)
         self._ensure_header()
+        # Rows are queued by the log* methods and written by a single flusher thread,
+        # so logging never blocks the caller on file I/O; None stops the thread
+        self._pending: queue.SimpleQueue = queue.SimpleQueue()
+        self._flusher = threading.Thread(target=self._flush_loop, name="system-logger", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+    
+    def close(self):
+        """Write any queued rows, then close the log file."""
+        if self._flusher.is_alive():
+            self._pending.put(None)
+            self._flusher.join()
+        self._file.close()
+    
+    def _flush_loop(self):
+        """Write queued rows in batches: whatever is queued, up to FLUSH_MAX_ROWS, per flush."""
+        while True:
+            row = self._pending.get()
+            stop = row is None
+            batch = [] if stop else [row]
+            while not stop and len(batch) < FLUSH_MAX_ROWS:
+                try:
+                    row = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                else:
+                    batch.append(row)
+            for row in batch:
+                self._format_row(row)
+            try:
+                self._file.flush()
+            except Exception as e:
+                print(f"Error writing to log: {e}")
+            if stop:
+                return
     
     def _ensure_header(self):
-        """Ensure CSV file has header."""
-        if not self.log_file.exists():
-            with open(self.log_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    "timestamp", "event_type", "user_email", "user_type",
-                    "candidate_id", "session_id", "request_id", "message_type",
-                    "content", "context_snapshot", "agent_involved",
-                    "data_sources_accessed", "response_time_ms", "status",
-                    "error_message", "metadata"
-                ])
+        """Ensure CSV file has header (written through the open handle if the file is empty)."""
+        if self._file.tell() == 0:
+            self._writer.writerow([
+                "timestamp", "event_type", "user_email", "user_type",
+                "candidate_id", "session_id", "request_id", "message_type",
+                "content", "context_snapshot", "agent_involved",
+                "data_sources_accessed", "response_time_ms", "status",
+                "error_message", "metadata"
+            ])
+            self._file.flush()
     
     def _write_row(self, row: Dict[str, Any]):
-        """Write a row to the log file."""
+        """Queue a row for the flusher thread."""
+        self._pending.put(row)
+    
+    def _format_row(self, row: Dict[str, Any]):
+        """Write a row to the log file buffer (flusher thread only)."""
         try:
-            with open(self.log_file, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    row.get("timestamp", ""),
-                    row.get("event_type", ""),
-                    row.get("user_email", ""),
-                    row.get("user_type", ""),
-                    row.get("candidate_id", ""),
-                    row.get("session_id", ""),
-                    row.get("request_id", ""),
-                    row.get("message_type", ""),
-                    str(row.get("content", "")),
-                    str(row.get("context_snapshot", "")),
-                    row.get("agent_involved", ""),
-                    row.get("data_sources_accessed", ""),
-                    row.get("response_time_ms", ""),
-                    row.get("status", ""),
-                    row.get("error_message", ""),
-                    str(row.get("metadata", ""))
-                ])
+            self._writer.writerow([
+                datetime.fromtimestamp(row["timestamp"], timezone.utc).isoformat(),
+                row.get("event_type", ""),
+                row.get("user_email", ""),
+                row.get("user_type", ""),
+                row.get("candidate_id", ""),
+                row.get("session_id", ""),
+                row.get("request_id", ""),
+                row.get("message_type", ""),
+                str(row.get("content", "")),
+                row.get("context_snapshot", ""),
+                row.get("agent_involved", ""),
+                row.get("data_sources_accessed", ""),
+                row.get("response_time_ms", ""),
+                row.get("status", ""),
+                row.get("error_message", ""),
+                row.get("metadata", "")
+            ])
         except Exception as e:
             print(f"Error writing to log: {e}")
     
@@ -68,7 +128,7 @@ class SystemLogger:
     ):
         """Log a general event."""
         row = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": time.time(),  # Formatted by the flusher thread
             "event_type": event_type,
             "user_email": user_email or "",
             "user_type": user_type or "",
@@ -83,7 +143,7 @@ class SystemLogger:
             "response_time_ms": "",
             "status": status,
             "error_message": error_message or "",
-            "metadata": kwargs
+            "metadata": json_cell(kwargs)  # Serialized now; callers may reuse what they passed
         }
         self._write_row(row)
     
@@ -121,7 +181,7 @@ class SystemLogger:
     ):
         """Log a system response."""
         row = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": time.time(),  # Formatted by the flusher thread
             "event_type": "Response",
             "user_email": user_email,
             "user_type": user_type,
@@ -130,7 +190,9 @@ class SystemLogger:
             "request_id": request_id or "",
             "message_type": "System Response",
             "content": response,
-            "context_snapshot": str(context_snapshot) if context_snapshot else "",
+            # Serialized now, not by the flusher thread: the caller's context dict may
+            # change before the row is written
+            "context_snapshot": json_cell(context_snapshot) if context_snapshot else "",
             "agent_involved": "",
             "data_sources_accessed": "",
             "response_time_ms": response_time_ms or "",